@@ -9,6 +9,32 @@ class Settings(BaseSettings):
     DB_NAME: str
     GEMINI_API_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    MONGO_MAX_POOL_SIZE: int = 50
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    EVENT_CACHE_MAX_SIZE: int = 512
+    EVENT_CACHE_TTL_SECONDS: int = 30
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 50 * 1024 * 1024
+    IMAGE_WORKERS: int = 2
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_INTERVAL_SECONDS: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+    PRINCIPAL_CACHE_MAX_SIZE: int = 2048
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    REGISTRATION_QUEUE_MAX_SIZE: int = 1000
+    REGISTRATION_BATCH_SIZE: int = 100
+    REGISTRATION_FLUSH_INTERVAL_MS: int = 20
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024
+    # Comma-separated usernames allowed to call maintenance endpoints (upload GC, import, jobs)
+    ADMIN_USERNAMES: str = ""
 
     class Config:
         env_file = ".env"
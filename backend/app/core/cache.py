@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import copy
+import time
+
+class TTLCache:
+    """
+    Small in-process cache with a per-entry time-to-live and LRU eviction.
+    Values are deep-copied on the way in and out so callers can mutate
+    what they get back without corrupting the cached copy; pass
+    copy_values=False to share immutable values such as compiled objects.
+    on_evict(key, value) is called whenever an entry leaves the cache through
+    expiry, LRU eviction, invalidate or clear, so callers can keep side indexes
+    in step with it.
+    """
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 30.0, copy_values: bool = True, on_evict=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._copy = copy.deepcopy if copy_values else (lambda value: value)
+        self._on_evict = on_evict
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self._evicted(key, value)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._copy(value)
+
+    def __contains__(self, key) -> bool:
+        """Whether key holds a live entry; does not count as a hit or miss."""
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] >= time.monotonic()
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, self._copy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            evicted_key, (_, evicted) = self._entries.popitem(last=False)
+            self._evicted(evicted_key, evicted)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._evicted(key, entry[1])
+
+    def clear(self):
+        entries, self._entries = self._entries, OrderedDict()
+        for key, (_, value) in entries.items():
+            self._evicted(key, value)
+
+    def _evicted(self, key, value):
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,8 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from app.config import settings
+import asyncio
+import threading
+import time
 
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
 )
 
 def hash_password(password: str) -> str:
@@ -10,3 +16,91 @@ def hash_password(password: str) -> str:
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
+
+def needs_rehash(hashed: str) -> bool:
+    """True when hashed was made with a different scheme or cost than pwd_context's."""
+    return pwd_context.needs_update(hashed)
+
+class PasswordPoolBusyError(Exception):
+    """Too many password operations are already waiting for a worker."""
+
+class PasswordHasherPool:
+    """
+    Runs bcrypt in a small thread pool (bcrypt releases the GIL) so hashing and
+    verification never block the event loop. At most max_queue operations may
+    wait for a worker; beyond that callers get PasswordPoolBusyError.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queued = 0
+        self.total_wait_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _track(self, fn, submitted_at: float):
+        def job(*args):
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait_seconds += time.monotonic() - submitted_at
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+        return job
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusyError("Too many password operations in flight, please retry shortly")
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        future = self._get_executor().submit(self._track(fn, time.monotonic()), *args)
+        future.add_done_callback(self._release_if_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _release_if_cancelled(self, future):
+        # A job cancelled before it started never reached _track's bookkeeping
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "maxQueued": self.max_queued,
+                "avgWaitMs": round(self.total_wait_seconds * 1000 / self.completed, 2) if self.completed else 0.0,
+            }
+
+password_pool = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_pool.run(verify_password, plain, hashed)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
 from pydantic_core import core_schema
@@ -38,6 +38,7 @@ class HighlightItem(BaseModel):
     role: Optional[str] = None
     contact: Optional[str] = None
     image: Optional[str] = None
+    imageVariants: Optional[Dict[str, str]] = None
     email: Optional[str] = None
 
 # FAQ schema
@@ -49,6 +50,7 @@ class FAQItem(BaseModel):
 class Sponsor(BaseModel):
     name: str
     logo: Optional[str] = None
+    logoVariants: Optional[Dict[str, str]] = None
     website: Optional[str] = None
 
 # Custom question schema
@@ -73,6 +75,9 @@ class Event(BaseModel):
     eventMode: str = Field(default="virtual", pattern="^(virtual|physical)$")
     bannerImage: Optional[str] = None  # Changed to Optional
     thumbnailImage: Optional[str] = None  # Changed to Optional
+    # Resized copies of the images above, keyed "<width>.<ext>"
+    bannerImageVariants: Optional[Dict[str, str]] = None
+    thumbnailImageVariants: Optional[Dict[str, str]] = None
     description: str
     highlights: List[HighlightItem] = []
     faqs: List[FAQItem] = []
@@ -93,6 +98,8 @@ class Event(BaseModel):
     requirePortfolio: bool = False
     customQuestions: List[CustomQuestion] = []
     instructions: Optional[str] = None
+    # Derived from date/month/year on every write; indexed for range queries and sorting
+    startsAt: Optional[datetime] = None
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
 
@@ -117,6 +124,8 @@ class EventUpdate(BaseModel):
     eventMode: Optional[str] = Field(default=None, pattern="^(virtual|physical)$")
     bannerImage: Optional[str] = None
     thumbnailImage: Optional[str] = None
+    bannerImageVariants: Optional[Dict[str, str]] = None
+    thumbnailImageVariants: Optional[Dict[str, str]] = None
     description: Optional[str] = None
     highlights: Optional[List[HighlightItem]] = None
     faqs: Optional[List[FAQItem]] = None
@@ -152,4 +161,58 @@ class EventUpdate(BaseModel):
         populate_by_name = True
         from_attributes = True
         arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+        json_encoders = {ObjectId: str}
+
+# Lightweight event schema for list pages (no nested highlights, faqs, sponsors, etc.)
+class EventCard(BaseModel):
+    eventId: Optional[PyObjectId] = Field(default=None, alias="_id")
+    eventName: str
+    tagline: Optional[str] = None
+    category: str
+    tags: List[str] = []
+    date: str
+    month: str
+    year: str
+    location: str
+    capacity: Optional[int] = None
+    eventMode: str = "virtual"
+    bannerImage: Optional[str] = None
+    thumbnailImage: Optional[str] = None
+    bannerImageVariants: Optional[Dict[str, str]] = None
+    thumbnailImageVariants: Optional[Dict[str, str]] = None
+    organizer: str
+    status: str
+    totalRegistrations: int = 0
+    startsAt: Optional[datetime] = None
+    createdAt: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+# Paginated list of event cards
+class EventCardPage(BaseModel):
+    items: List[EventCard]
+    nextCursor: Optional[str] = None
+
+# Relevance-ranked search results
+class EventSearchPage(BaseModel):
+    items: List[EventCard]
+    total: int
+    offset: int
+    limit: int
+
+# One value of a facet and how many events have it
+class EventFacetValue(BaseModel):
+    value: str
+    count: int
+
+# Filtered event cards plus per-facet counts
+class EventFacetPage(BaseModel):
+    items: List[EventCard]
+    total: int
+    offset: int
+    limit: int
+    facets: Dict[str, List[EventFacetValue]]
@@ -11,6 +11,26 @@ class Answer(BaseModel):
 class EventRegistrationUpdate(BaseModel):
     answers: Optional[List[Answer]] = None
     created_at: Optional[datetime] = None
+class EventParticipant(BaseModel):
+    id: str
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    image: Optional[str] = None
+    registeredOn: Optional[datetime] = None
+class AnswerCount(BaseModel):
+    answer: str
+    count: int
+class QuestionAnalytics(BaseModel):
+    index: int
+    question: Optional[str] = None
+    type: Optional[str] = None
+    responses: int
+    answers: List[AnswerCount] = []
+class RegistrationAnalytics(BaseModel):
+    event_id: str
+    totalRegistrations: int
+    questions: List[QuestionAnalytics] = []
 class EventRegistration(BaseModel):
     event_id: str
     user_id: str
@@ -39,6 +39,7 @@ async def delete_blog_route(blog_id: str):
 
 @router.patch("/{blog_id}", response_model=Blog)
 async def modify_blog_route(blog_id: str, update_data: BlogUpdate):
-    result = await modify_blog(blog_id, update_data.dict(exclude_unset=True))
-    updated = await get_blog_by_id(blog_id)
+    updated = await modify_blog(blog_id, update_data.dict(exclude_unset=True))
+    if not updated:
+        raise HTTPException(status_code=404, detail="Blog not found")
     return Blog.parse_obj(updated)
@@ -1,17 +1,25 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
-from app.services.event_service import create_event, get_event_by_id, get_event_by_name, delete_event, modify_event, get_all_events
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Response, Request
+from fastapi.responses import StreamingResponse
+from app.services.event_service import create_event, get_event_by_id, get_event_by_name, delete_event, modify_event, get_all_events, get_events_page, EVENT_CARD_PROJECTION, get_event_cache_stats, register_user_for_event, search_events, get_event_facets, import_events, export_events, cascade_delete_event, get_event_participants, release_event_seat
+from app.services.job_service import create_job, start_job
 from app.services.notification_services import post_notification
-from app.models.event_model import Event, EventUpdate
+from app.services.upload_service import store_upload, store_uploads, event_upload_paths, release_uploads, UploadTooLargeError
+from app.services.image_service import generate_derivatives
+from app.services.answer_validation_service import get_answer_validator, AnswerValidationError
+from app.models.event_model import Event, EventUpdate, EventCard, EventCardPage, EventSearchPage, EventFacetPage
 from app.models.notification_model import Notification
+from app.models.event_registration_model import EventParticipant
 from bson.objectid import ObjectId
 from pydantic import BaseModel, Json
+import asyncio
 import json
 import logging
 from typing import List, Dict
-from pathlib import Path
 from fastapi import Form
 from app.models.user_model import User
-from app.services.user_service import get_user_by_id, update_user
+from app.services.user_service import get_user_by_id, patch_user
+from app.routes.routes_user import get_current_admin
+from app.config import settings
 from datetime import datetime
 
 # Configure logging
@@ -23,27 +31,160 @@ router = APIRouter(prefix="/events", tags=["events"])
 class DeleteResponse(BaseModel):
     message: str
 
+class DeleteJobResponse(BaseModel):
+    message: str
+    jobId: str
+
 class ExtendDeadlineRequest(BaseModel):
     newDate: str  # Expected format: YYYY-MM-DD
     reason: str | None = None
 
 @router.get("/", response_model=List[Event])
-async def get_all_events_route():
+async def get_all_events_route(
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=100),
+    after: str | None = Query(None),
+    sort: str = Query("-createdAt"),
+    startsAfter: datetime | None = Query(None),
+    startsBefore: datetime | None = Query(None),
+):
     try:
-        events = await get_all_events()
+        if limit is None and after is None and startsAfter is None and startsBefore is None and sort == "-createdAt":
+            events = await get_all_events()
+        else:
+            # Without limit or cursor the whole (sorted, filtered) list is returned, as before paging
+            page_size = limit or (20 if after else None)
+            events, next_cursor = await get_events_page(page_size, after, None, sort, startsAfter, startsBefore)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
         return [Event.parse_obj(event) for event in events]
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving events: {str(e)}")
 
+@router.get("/cards", response_model=EventCardPage)
+async def get_event_cards(
+    limit: int = Query(20, ge=1, le=100),
+    after: str | None = Query(None),
+    sort: str = Query("-createdAt"),
+    startsAfter: datetime | None = Query(None),
+    startsBefore: datetime | None = Query(None),
+):
+    try:
+        events, next_cursor = await get_events_page(limit, after, EVENT_CARD_PROJECTION, sort, startsAfter, startsBefore)
+        return EventCardPage(
+            items=[EventCard.parse_obj(event) for event in events],
+            nextCursor=next_cursor,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving events: {str(e)}")
+
+@router.get("/search", response_model=EventSearchPage)
+async def search_events_route(
+    q: str = Query(..., min_length=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        events, total = await search_events(q, offset, limit)
+        return EventSearchPage(
+            items=[EventCard.parse_obj(event) for event in events],
+            total=total,
+            offset=offset,
+            limit=limit,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching events: {str(e)}")
+
+@router.get("/facets", response_model=EventFacetPage)
+async def get_event_facets_route(
+    category: str | None = Query(None),
+    tag: str | None = Query(None),
+    month: str | None = Query(None),
+    year: str | None = Query(None),
+    status: str | None = Query(None),
+    eventMode: str | None = Query(None),
+    startsAfter: datetime | None = Query(None),
+    startsBefore: datetime | None = Query(None),
+    sort: str = Query("-createdAt"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        filters = {"category": category, "tag": tag, "month": month, "year": year, "status": status, "eventMode": eventMode}
+        page = await get_event_facets(filters, offset, limit, sort, startsAfter, startsBefore)
+        return EventFacetPage(
+            items=[EventCard.parse_obj(event) for event in page["items"]],
+            total=page["total"],
+            offset=offset,
+            limit=limit,
+            facets=page["facets"],
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving event facets: {str(e)}")
+
+async def _ndjson_lines(request: Request, max_line_bytes: int = None):
+    """
+    Split a streamed request body into lines without buffering the whole body.
+    A line longer than max_line_bytes is dropped as it streams in and a
+    ValueError is yielded in its place, so the import reports it for that line.
+    """
+    max_line_bytes = max_line_bytes or settings.IMPORT_MAX_LINE_BYTES
+    pending = bytearray()
+    oversized = False
+    async for chunk in request.stream():
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            piece = chunk[start:] if end == -1 else chunk[start:end]
+            if not oversized:
+                if len(pending) + len(piece) > max_line_bytes:
+                    oversized = True
+                    pending.clear()
+                else:
+                    pending += piece
+            if end == -1:
+                break
+            yield ValueError(f"Line exceeds {max_line_bytes} bytes") if oversized else bytes(pending)
+            pending.clear()
+            oversized = False
+            start = end + 1
+    if oversized:
+        yield ValueError(f"Line exceeds {max_line_bytes} bytes")
+    elif pending:
+        yield bytes(pending)
+
+@router.post("/import", response_model=Dict)
+async def import_events_route(request: Request, admin: Dict = Depends(get_current_admin)):
+    """Bulk-create events from an NDJSON body (one event per line); errors are reported per line."""
+    try:
+        return await import_events(_ndjson_lines(request))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing events: {str(e)}")
+
+@router.get("/export")
+async def export_events_route():
+    """Stream every event as NDJSON, in the format accepted by POST /events/import."""
+    return StreamingResponse(
+        export_events(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="events.ndjson"'},
+    )
+
+@router.get("/cache/stats", response_model=Dict)
+async def get_event_cache_stats_route():
+    return get_event_cache_stats()
+
 @router.post("/", response_model=Event)
 async def create_new_event(event: Event):
     try:
         event_data = event.dict(exclude_unset=True)
-        created_event_id = await create_event(event_data)
-        created_event_data = await get_event_by_id(created_event_id)
-        if not created_event_data:
-            raise HTTPException(status_code=404, detail="Created event not found")
-        created_event_data["_id"] = created_event_id
+        created_event_data = await create_event(event_data)
         return Event.parse_obj(created_event_data)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -77,7 +218,7 @@ async def get_event_by_eventname(event_name: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving event: {str(e)}")
 
-@router.delete("/{event_id}", response_model=DeleteResponse)
+@router.delete("/{event_id}", response_model=DeleteJobResponse, status_code=202)
 async def delete_event_route(event_id: str):
     try:
         if not ObjectId.is_valid(event_id):
@@ -100,7 +241,11 @@ async def delete_event_route(event_id: str):
             created_at=datetime.utcnow()
         )
         await post_notification(notification_data.dict())
-        return {"message": "Event deleted and cancellation notification posted"}
+        # Clean up registrations, user entries and uploads in the background
+        job_id = await create_job("event_cascade_delete", {"event_id": event_id})
+        upload_paths = event_upload_paths(event)
+        start_job(job_id, lambda job_id: cascade_delete_event(event_id, job_id, upload_paths))
+        return {"message": "Event deleted and cancellation notification posted", "jobId": job_id}
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -114,13 +259,9 @@ async def modify_event_route(event_id: str, update_data: EventUpdate):
         if not ObjectId.is_valid(event_id):
             raise HTTPException(status_code=400, detail="Invalid event ID")
         update_dict = update_data.dict(exclude_unset=True)
-        result = await modify_event(event_id, update_dict)
-        if not result or result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Event not found or no fields updated")
-        updated_event = await get_event_by_id(event_id)
+        updated_event = await modify_event(event_id, update_dict)
         if not updated_event:
-            raise HTTPException(status_code=404, detail="Updated event not found")
-        updated_event["_id"] = event_id
+            raise HTTPException(status_code=404, detail="Event not found or no fields updated")
         return Event.parse_obj(updated_event)
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
@@ -179,20 +320,6 @@ async def create_event_multipart(
         required_basic_info = json.loads(requiredBasicInfo) if requiredBasicInfo else []
         required_web_links = json.loads(requiredWebLinks) if requiredWebLinks else []
         custom_questions = json.loads(customQuestions) if customQuestions else []
-        upload_dir = Path("uploads")
-        upload_dir.mkdir(exist_ok=True)
-        banner_path = None
-        if bannerImage:
-            banner_path = upload_dir / bannerImage.filename
-            with banner_path.open("wb") as f:
-                f.write(await bannerImage.read())
-            logger.debug(f"Saved bannerImage to {banner_path}")
-        thumbnail_path = None
-        if thumbnailImage:
-            thumbnail_path = upload_dir / thumbnailImage.filename
-            with thumbnail_path.open("wb") as f:
-                f.write(await thumbnailImage.read())
-            logger.debug(f"Saved thumbnailImage to {thumbnail_path}")
         sponsor_logos = [
             sponsor_logo_0,
             sponsor_logo_1,
@@ -200,14 +327,6 @@ async def create_event_multipart(
             sponsor_logo_3,
             sponsor_logo_4,
         ]
-        for i, logo in enumerate(sponsor_logos):
-            if logo and i < len(sponsors_list):
-                logo_path = upload_dir / logo.filename
-                with logo_path.open("wb") as f:
-                    f.write(await logo.read())
-                sponsors_list[i]["logo"] = str(logo_path)
-            elif i < len(sponsors_list):
-                sponsors_list[i]["logo"] = None
         highlight_images = [
             highlight_image_0,
             highlight_image_1,
@@ -215,14 +334,25 @@ async def create_event_multipart(
             highlight_image_3,
             highlight_image_4,
         ]
-        for i, image in enumerate(highlight_images):
-            if image and i < len(highlights_list):
-                image_path = upload_dir / image.filename
-                with image_path.open("wb") as f:
-                    f.write(await image.read())
-                highlights_list[i]["image"] = str(image_path)
-            elif i < len(highlights_list):
-                highlights_list[i]["image"] = None
+        # Stream all files of this request into the upload store concurrently
+        files = {"banner": bannerImage, "thumbnail": thumbnailImage}
+        files.update({("sponsor", i): logo for i, logo in enumerate(sponsor_logos) if i < len(sponsors_list)})
+        files.update({("highlight", i): image for i, image in enumerate(highlight_images) if i < len(highlights_list)})
+        files = {key: upload for key, upload in files.items() if upload}
+        stored_paths = dict(zip(files.keys(), await store_uploads(list(files.values()))))
+        logger.debug(f"Stored {len(stored_paths)} uploads for event {eventName}")
+        # Resize every stored image in the process pool
+        variants = dict(zip(stored_paths.keys(), await asyncio.gather(*map(generate_derivatives, stored_paths.values()))))
+        banner_path = stored_paths.get("banner")
+        thumbnail_path = stored_paths.get("thumbnail")
+        for i, sponsor in enumerate(sponsors_list):
+            if i < len(sponsor_logos):
+                sponsor["logo"] = stored_paths.get(("sponsor", i))
+                sponsor["logoVariants"] = variants.get(("sponsor", i))
+        for i, highlight in enumerate(highlights_list):
+            if i < len(highlight_images):
+                highlight["image"] = stored_paths.get(("highlight", i))
+                highlight["imageVariants"] = variants.get(("highlight", i))
         event_data = {
             "eventName": eventName,
             "tagline": tagline,
@@ -236,6 +366,8 @@ async def create_event_multipart(
             "eventMode": eventMode,
             "bannerImage": str(banner_path) if banner_path else "",
             "thumbnailImage": str(thumbnail_path) if thumbnail_path else "",
+            "bannerImageVariants": variants.get("banner"),
+            "thumbnailImageVariants": variants.get("thumbnail"),
             "description": description,
             "highlights": highlights_list,
             "faqs": faqs_list,
@@ -257,12 +389,11 @@ async def create_event_multipart(
             "customQuestions": custom_questions,
             "instructions": instructions,
         }
-        created_event_id = await create_event(event_data)
-        created_event_data = await get_event_by_id(created_event_id)
-        if not created_event_data:
-            raise HTTPException(status_code=404, detail="Created event not found")
-        created_event_data["_id"] = created_event_id
+        created_event_data = await create_event(event_data)
         return Event.parse_obj(created_event_data)
+    except UploadTooLargeError as e:
+        logger.error(f"Upload too large: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
     except json.JSONDecodeError as e:
         logger.error(f"JSON decode error: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Invalid JSON in form data: {str(e)}")
@@ -279,6 +410,31 @@ async def get_current_user(user_id: str):
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+@router.get("/{event_id}/participants", response_model=List[EventParticipant])
+async def get_event_participants_route(
+    event_id: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    after: str | None = Query(None),
+):
+    """Page through an event's roster; the next page's cursor is sent in X-Next-Cursor."""
+    try:
+        if not ObjectId.is_valid(event_id):
+            raise HTTPException(status_code=400, detail="Invalid event ID")
+        page = await get_event_participants(event_id, limit, after)
+        if page is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        participants, next_cursor = page
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [EventParticipant.parse_obj(participant) for participant in participants]
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving participants: {str(e)}")
+
 @router.post("/{event_id}/register", response_model=Dict)
 async def register_for_event(
     event_id: str,
@@ -297,8 +453,6 @@ async def register_for_event(
             raise HTTPException(status_code=404, detail="Event not found")
         if event["status"] != "upcoming":
             raise HTTPException(status_code=400, detail="Registration is closed for this event")
-        if str(user_id) in event["registeredUsers"]:
-            raise HTTPException(status_code=400, detail="User already registered for this event")
         
         # Parse JSON data if provided
         registration_data = {}
@@ -321,10 +475,7 @@ async def register_for_event(
                 raise HTTPException(status_code=400, detail="Resume is required")
             if resume.content_type not in [f"application/{ext.lower()}" for ext in event["allowedFileTypes"]]:
                 raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {', '.join(event['allowedFileTypes'])}")
-            resume_path = Path("uploads") / f"{user_id}_{event_id}_{resume.filename}"
-            with resume_path.open("wb") as f:
-                f.write(await resume.read())
-            registration_data["resume"] = str(resume_path)
+            registration_data["resume"] = None
         if event["requireBasicInfo"]:
             if not basic_info:
                 raise HTTPException(status_code=400, detail="Basic information is required")
@@ -346,44 +497,51 @@ async def register_for_event(
         if event["customQuestions"]:
             if not custom_answers:
                 raise HTTPException(status_code=400, detail="Custom question answers are required")
-            for question in event["customQuestions"]:
-                question_text = question["question"]
-                if question_text not in custom_answers:
-                    raise HTTPException(status_code=400, detail=f"Missing answer for: {question_text}")
-                answer = custom_answers[question_text]
-                if question["type"] == "MCQ" and answer not in question["options"]:
-                    raise HTTPException(status_code=400, detail=f"Invalid answer for {question_text}. Allowed: {', '.join(question['options'])}")
-                if question["type"] == "Yes/No" and answer not in ["Yes", "No"]:
-                    raise HTTPException(status_code=400, detail=f"Invalid answer for {question_text}. Allowed: Yes, No")
-                if question["type"] == "Question/Answer":
-                    if question["answerType"] == "Integer":
-                        try:
-                            int(answer)
-                        except ValueError:
-                            raise HTTPException(status_code=400, detail=f"Answer for {question_text} must be an integer")
+            try:
+                get_answer_validator(event).validate_by_text(custom_answers)
+            except AnswerValidationError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             registration_data["custom_answers"] = custom_answers
         
-        # Update event
-        update_data = {
-            "registeredUsers": event["registeredUsers"] + [str(user_id)],
-            "totalRegistrations": event["totalRegistrations"] + 1,
-            "updatedAt": datetime.utcnow()
-        }
-        await modify_event(event_id, update_data)
-        
-        # Update user
-        user_update_data = {
-            "eventsRegistered": current_user.get("eventsRegistered", []) + [{
+        # Store the resume first so a rejected or oversized upload never holds a seat
+        if "resume" in registration_data:
+            registration_data["resume"] = await store_upload(resume)
+
+        # Claim a seat with a single guarded update
+        try:
+            outcome = await register_user_for_event(event_id, str(user_id))
+        except BaseException:
+            await release_uploads([registration_data.get("resume")])
+            raise
+        if outcome != "registered":
+            await release_uploads([registration_data.get("resume")])
+        if outcome == "not_found":
+            raise HTTPException(status_code=404, detail="Event not found")
+        if outcome == "closed":
+            raise HTTPException(status_code=400, detail="Registration is closed for this event")
+        if outcome == "already_registered":
+            raise HTTPException(status_code=400, detail="User already registered for this event")
+        if outcome == "full":
+            raise HTTPException(status_code=400, detail="Event is full")
+
+        # Append just this registration to the user's list; give the seat back if that fails
+        try:
+            await patch_user(user_id, push={"eventsRegistered": [{
                 "eventId": event_id,
                 "registeredAt": datetime.utcnow(),
                 **registration_data
-            }],
-            "updatedAt": datetime.utcnow()
-        }
-        await update_user(user_id, user_update_data)
+            }]})
+        except BaseException:
+            await release_event_seat(event_id, str(user_id))
+            await release_uploads([registration_data.get("resume")])
+            raise
         
         logger.info(f"User {user_id} registered for event {event_id}")
         return {"message": "Successfully registered for the event", "eventId": event_id}
+    except HTTPException as he:
+        raise he
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as ve:
         logger.error(f"Validation error in register_for_event: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -415,8 +573,8 @@ async def extend_event_deadline(event_id: str, extension: ExtendDeadlineRequest)
             "year": str(new_date.year),
             "updatedAt": datetime.utcnow()
         }
-        result = await modify_event(event_id, update_data)
-        if not result or result.matched_count == 0:
+        updated_event = await modify_event(event_id, update_data)
+        if not updated_event:
             raise HTTPException(status_code=404, detail="Event not found or no fields updated")
         # Post deadline extension notification
         notification_data = Notification(
@@ -430,11 +588,6 @@ async def extend_event_deadline(event_id: str, extension: ExtendDeadlineRequest)
             created_at=datetime.utcnow()
         )
         await post_notification(notification_data.dict())
-        # Fetch updated event
-        updated_event = await get_event_by_id(event_id)
-        if not updated_event:
-            raise HTTPException(status_code=404, detail="Updated event not found")
-        updated_event["_id"] = event_id
         return Event.parse_obj(updated_event)
     except ValueError as ve:
         logger.error(f"Validation error in extend_event_deadline: {str(ve)}")
@@ -1,23 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import List
 from bson import ObjectId
-from ..models.event_registration_model import EventRegistration,EventRegistrationUpdate
+from ..models.event_registration_model import EventRegistration,EventRegistrationUpdate,RegistrationAnalytics
 from ..services.event_registration_services import (
-    create_registration,
-    get_registration,
     get_registration_by_event_and_user,
     get_registrations_by_event,
+    registration_question_columns,
+    export_registrations,
+    get_answer_analytics,
     update_registration,
     delete_registration
 )
 from ..services.event_service import get_event_by_id
-from ..models.event_model import Event
+from ..services.registration_queue_service import queue_registration, RegistrationQueueFullError
+from ..services.answer_validation_service import get_answer_validator, AnswerValidationError
 import logging
 
 router = APIRouter(prefix="/event_registrations", tags=["event_registrations"])
 logger = logging.getLogger(__name__)
 
-async def validate_event(event_id: str) -> Event:
+async def validate_event(event_id: str) -> dict:
     """Validate that the event_id is a valid ObjectId and the event exists."""
     if not ObjectId.is_valid(event_id):
         logger.error(f"Invalid event ID: {event_id}")
@@ -26,7 +29,7 @@ async def validate_event(event_id: str) -> Event:
     if not event:
         logger.error(f"Event not found for ID: {event_id}")
         raise HTTPException(status_code=404, detail="Event not found")
-    return Event.parse_obj(event)
+    return event
 
 @router.post("/", response_model=EventRegistration)
 async def create_event_registration(registration: EventRegistration):
@@ -44,41 +47,24 @@ async def create_event_registration(registration: EventRegistration):
         raise HTTPException(status_code=500, detail=f"Error validating event: {str(e)}")
     
     # Validate answers against event's customQuestions
-    custom_questions = event.customQuestions or []
-    logger.info(f"Event has {len(custom_questions)} custom questions")
-    for answer in registration.answers or []:
-        if answer.index >= len(custom_questions):
-            logger.error(f"Invalid question index: {answer.index} (max index: {len(custom_questions)-1})")
-            raise HTTPException(status_code=400, detail=f"Invalid question index: {answer.index}")
-        question = custom_questions[answer.index]
-        logger.debug(f"Validating answer for question {answer.index}: {question.question}")
-        if question.type == "MCQ" and answer.answer not in question.options:
-            logger.error(f"Invalid MCQ answer for question {answer.index}: {answer.answer} not in {question.options}")
-            raise HTTPException(status_code=400, detail=f"Invalid answer for MCQ question {answer.index}: {answer.answer}")
-        if question.type == "Yes/No" and answer.answer not in ["Yes", "No"]:
-            logger.error(f"Invalid Yes/No answer for question {answer.index}: {answer.answer}")
-            raise HTTPException(status_code=400, detail=f"Invalid answer for Yes/No question {answer.index}: {answer.answer}")
-        if question.type == "Question/Answer" and question.answerType == "Integer":
-            try:
-                int(answer.answer)
-            except ValueError:
-                logger.error(f"Invalid integer answer for question {answer.index}: {answer.answer}")
-                raise HTTPException(status_code=400, detail=f"Answer for question {answer.index} must be an integer")
+    validator = get_answer_validator(event)
+    logger.info(f"Event has {len(validator)} custom questions")
+    try:
+        validator.validate_indexed(registration.answers)
+    except AnswerValidationError as e:
+        logger.error(f"Answer validation failed: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Create registration
+    # Queue the registration; it is committed with others arriving at the same moment
     try:
-        registration_data = registration.dict()
-        registration_id = await create_registration(registration_data)
-        logger.info(f"Registration created with ID: {registration_id}")
-        created_registration = await get_registration(registration_id)
-        if not created_registration:
-            logger.error(f"Created registration not found: {registration_id}")
-            raise HTTPException(status_code=404, detail="Created registration not found")
-        logger.info(f"Successfully created registration: {created_registration}")
+        created_registration = await queue_registration(registration.dict())
+        logger.info(f"Registration created with ID: {created_registration['_id']}")
         return EventRegistration.parse_obj(created_registration)
-    except HTTPException as e:
-        logger.error(f"HTTP error during registration creation: {str(e)}")
-        raise e
+    except RegistrationQueueFullError as e:
+        logger.warning(f"Registration queue full, rejecting request for event {registration.event_id}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Invalid registration data: {str(ve)}")
     except Exception as e:
         logger.error(f"Unexpected error during registration creation: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error creating registration: {str(e)}")
@@ -99,37 +85,46 @@ async def get_event_registrations(event_id: str):
     registrations = await get_registrations_by_event(event_id)
     return [EventRegistration.parse_obj(reg) for reg in registrations]
 
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+@router.get("/event/{event_id}/export")
+async def export_event_registrations(event_id: str, format: str = Query("csv")):
+    """Stream an event's registrations as CSV or NDJSON with one column per custom question."""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Allowed: {', '.join(EXPORT_MEDIA_TYPES)}")
+    event = await validate_event(event_id)
+    questions = registration_question_columns(event.get("customQuestions"))
+    return StreamingResponse(
+        export_registrations(event_id, questions, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="registrations-{event_id}.{format}"'},
+    )
+
+@router.get("/event/{event_id}/analytics", response_model=RegistrationAnalytics)
+async def get_event_registration_analytics(event_id: str):
+    """Per-question answer counts for an event's registrations."""
+    event = await validate_event(event_id)
+    try:
+        return RegistrationAnalytics.parse_obj(await get_answer_analytics(event_id, event.get("customQuestions")))
+    except Exception as e:
+        logger.error(f"Error computing analytics for event {event_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error computing analytics: {str(e)}")
+
 @router.patch("/{event_id}/{user_id}", response_model=EventRegistration)
 async def update_event_registration(event_id: str, user_id: str, update_data: EventRegistrationUpdate):
     """Update answers for an existing registration."""
-    await validate_event(event_id)
-    
-    event = Event.parse_obj(await get_event_by_id(event_id))
-    custom_questions = event.customQuestions or []
+    event = await validate_event(event_id)
 
     if update_data.answers:
-        for answer in update_data.answers:
-            if answer.index >= len(custom_questions):
-                raise HTTPException(status_code=400, detail=f"Invalid question index: {answer.index}")
-            question = custom_questions[answer.index]
-            if question.type == "MCQ" and answer.answer not in question.options:
-                raise HTTPException(status_code=400, detail=f"Invalid answer for MCQ question {answer.index}: {answer.answer}")
-            if question.type == "Yes/No" and answer.answer not in ["Yes", "No"]:
-                raise HTTPException(status_code=400, detail=f"Invalid answer for Yes/No question {answer.index}: {answer.answer}")
-            if question.type == "Question/Answer" and question.answerType == "Integer":
-                try:
-                    int(answer.answer)
-                except ValueError:
-                    raise HTTPException(status_code=400, detail=f"Answer for question {answer.index} must be an integer")
+        try:
+            get_answer_validator(event).validate_indexed(update_data.answers)
+        except AnswerValidationError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
     update_dict = update_data.dict(exclude_unset=True)
-    result = await update_registration(event_id, user_id, update_dict)
-    if not result or result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Registration not found or no fields updated")
-
-    updated_registration = await get_registration_by_event_and_user(event_id, user_id)
+    updated_registration = await update_registration(event_id, user_id, update_dict)
     if not updated_registration:
-        raise HTTPException(status_code=404, detail="Updated registration not found")
+        raise HTTPException(status_code=404, detail="Registration not found or no fields updated")
 
     return EventRegistration.parse_obj(updated_registration)
 
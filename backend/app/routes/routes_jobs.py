@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.services.job_service import get_job
+from app.routes.routes_user import get_current_admin
+from typing import Dict
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/{job_id}", response_model=Dict)
+async def get_job_route(job_id: str, admin: dict = Depends(get_current_admin)):
+    """Status and progress of a background job, e.g. an event deletion cascade."""
+    try:
+        job = await get_job(job_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
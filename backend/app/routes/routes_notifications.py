@@ -1,10 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from app.models.notification_model import Notification
 from app.services.notification_services import post_notification, get_notifications_by_event
+from app.services.upload_service import store_upload, UploadTooLargeError
 from typing import Optional
 from datetime import datetime
 import pytz
-import os
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
@@ -35,12 +35,10 @@ async def create_notification(
     }
 
     if type == "poster" and poster:
-        upload_dir = "uploads/posters"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, poster.filename)
-        with open(file_path, "wb") as f:
-            f.write(poster.file.read())
-        notification_data["poster_url"] = file_path
+        try:
+            notification_data["poster_url"] = await store_upload(poster)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
 
     inserted_id = await post_notification(notification_data)
     return {"message": "Notification posted", "id": str(inserted_id)}
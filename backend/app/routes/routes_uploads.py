@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.services.upload_service import (
+    UPLOAD_ROOT,
+    collect_garbage_uploads,
+    is_public_upload,
+    resolve_upload_path,
+    upload_validators,
+    user_owns_upload,
+)
+from app.routes.routes_user import get_current_admin, get_current_user, is_admin
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict
+import asyncio
+import logging
+import mimetypes
+import os
+import stat
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+@router.post("/gc", response_model=Dict)
+async def collect_garbage_uploads_route(admin: dict = Depends(get_current_admin)):
+    """Delete stored uploads no longer referenced by any event, notification or registration."""
+    try:
+        return await collect_garbage_uploads()
+    except Exception as e:
+        logger.error(f"Error collecting unreferenced uploads: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error collecting uploads: {str(e)}")
+
+def _not_modified(request: Request, etag: str, stat_result: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def _authorize_private_upload(request: Request, file_path: str):
+    """Let admins and the registration's owner read a private upload; everyone else gets 404."""
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization required", headers={"WWW-Authenticate": "Bearer"})
+    principal = await get_current_user(authorization)
+    if is_admin(principal):
+        return
+    if not await user_owns_upload(principal["_id"], str(UPLOAD_ROOT / file_path)):
+        raise HTTPException(status_code=404, detail="File not found")
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_upload(file_path: str, request: Request):
+    """
+    Serve a stored upload. Supports conditional GET (ETag / If-Modified-Since)
+    and byte ranges; the body is streamed from disk, or handed to the server
+    via the ASGI pathsend extension where it supports zero-copy sends.
+    Images are public; other files (resumes) need the owner's or an admin's token.
+    """
+    path = resolve_upload_path(file_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    # Checked before touching the disk so private names cannot be probed
+    public = is_public_upload(file_path)
+    if not public:
+        await _authorize_private_upload(request, file_path)
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag, immutable = upload_validators(file_path, stat_result)
+    if not public:
+        cache_control = PRIVATE_CACHE_CONTROL
+    else:
+        cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+    if not public:
+        headers["vary"] = "Authorization"
+    if _not_modified(request, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        stat_result=stat_result,
+    )
@@ -1,19 +1,16 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Header
-from app.services.user_service import create_user, get_user_by_id, get_user_by_name, delete_user, update_user
+from app.services.user_service import create_user, get_user_by_id, get_user_by_name, delete_user, update_user, get_cached_principal, cache_principal, schedule_password_rehash
 from app.models.user_model import User, UserUpdate
 from bson.objectid import ObjectId
-from app.core.security import hash_password
-from app.core.security import verify_password
+from app.core.security import hash_password_async, verify_password_async, password_pool, PasswordPoolBusyError
 
 from pydantic import BaseModel
+from typing import Optional
 import logging
 from app.jwt_handler import verify_token, create_access_token
-from motor.motor_asyncio import AsyncIOMotorClient
+from app.services.token_service import issue_refresh_token, rotate_refresh_token, InvalidRefreshTokenError
 from app.config import settings
-
-# Initialize MongoDB client
-db_client = AsyncIOMotorClient(settings.MONGO_URI)
-db = db_client[settings.DB_NAME]
+from db import get_collection
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +26,10 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str
     user_id: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class DeleteResponse(BaseModel):
     message: str
@@ -44,7 +45,10 @@ async def get_current_user(authorization: str = Header(...)):
     try:
         token = authorization.split("Bearer ")[1] if "Bearer " in authorization else authorization
         payload = verify_token(token)
-        logger.info(f"Token payload: {payload}")
+        principal = get_cached_principal(token)
+        if principal is not None:
+            return principal
+        logger.debug(f"Token payload: {payload}")
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(
@@ -59,7 +63,7 @@ async def get_current_user(authorization: str = Header(...)):
                 detail=f"User not found for username: {username}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user
+        return cache_principal(token, user)
     except IndexError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -67,12 +71,22 @@ async def get_current_user(authorization: str = Header(...)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def is_admin(principal: dict) -> bool:
+    admins = {name.strip() for name in settings.ADMIN_USERNAMES.split(",") if name.strip()}
+    return principal.get("username") in admins
+
+# Dependency for maintenance endpoints: the bearer must be one of ADMIN_USERNAMES
+async def get_current_admin(current_user: dict = Depends(get_current_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
 @router.post("/", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_user(user: User):
     try:
         logger.info(f"Received user data for creation: {user.dict(exclude_unset=True)}")
         # Check if username or email already exists
-        existing_user = await db["user"].find_one({
+        existing_user = await get_collection("user").find_one({
             "$or": [
                 {"username": user.username},
                 {"email": user.email}
@@ -82,32 +96,38 @@ async def create_new_user(user: User):
             logger.warning(f"User creation failed: Username {user.username} or email {user.email} already exists")
             raise HTTPException(status_code=400, detail="Username or email already exists")
 
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
         user_data = user.dict(exclude_unset=True)
         user_data["password"] = hashed_password
         # Remove _id if present to let MongoDB generate it
         user_data.pop("_id", None)
-        user_id = await create_user(user_data)
-        created_user = await get_user_by_id(str(user_id))
-        if not created_user:
-            logger.error(f"Failed to retrieve user with ID: {user_id}")
-            raise HTTPException(status_code=500, detail="Failed to retrieve created user")
-        
+        created_user = await create_user(user_data)
+        user_id = created_user["_id"]
+
         # Generate JWT token for the new user
         access_token = create_access_token(data={"sub": created_user["username"]})
+        refresh_token = await issue_refresh_token(user_id, created_user["username"])
         logger.info(f"User created and token generated for username: {created_user['username']}")
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "user_id": str(user_id)
+            "user_id": str(user_id),
+            "refresh_token": refresh_token,
         }
     except HTTPException as he:
         logger.error(f"HTTP error during user creation: {he.detail}")
         raise he
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error creating user: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error creating user: {str(e)}")
 
+@router.get("/password-pool/stats", response_model=dict)
+async def get_password_pool_stats():
+    """Queue depth and throughput of the bcrypt worker pool."""
+    return password_pool.stats()
+
 @router.get("/{user_id}", response_model=User)
 async def get_user(user_id: str, current_user: dict = Depends(get_current_user)):
     if not ObjectId.is_valid(user_id):
@@ -144,15 +164,14 @@ async def update_user_route(user_id: str, user_update: UserUpdate, current_user:
     if not ObjectId.is_valid(user_id):
         logger.warning(f"Invalid user ID format: {user_id}")
         raise HTTPException(status_code=400, detail="Invalid user ID format")
-    user = await get_user_by_id(user_id)
-    if not user:
-        logger.warning(f"User not found: {user_id}")
-        raise HTTPException(status_code=404, detail="User not found")
     update_data = user_update.dict(exclude_unset=True)
     if not update_data:
         logger.warning(f"No data provided for update for user: {user_id}")
         raise HTTPException(status_code=400, detail="No data provided for update")
-    updated_user = await update_user(user_id, update_data)
+    try:
+        updated_user = await update_user(user_id, update_data)
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if not updated_user:
         logger.error(f"Failed to update user: {user_id}")
         raise HTTPException(status_code=400, detail="Failed to update user")
@@ -162,7 +181,7 @@ async def update_user_route(user_id: str, user_update: UserUpdate, current_user:
 @router.post("/login", response_model=TokenResponse)
 async def login_user(login_data: LoginRequest):
     try:
-        collection = db["user"]
+        collection = get_collection("user")
         if collection is None:
             logger.error("Database collection 'user' is None")
             raise HTTPException(status_code=500, detail="Database configuration error: collection is None")
@@ -184,21 +203,49 @@ async def login_user(login_data: LoginRequest):
             logger.error(f"User {login_data.identifier} has invalid or missing password field: {password_hash}")
             raise HTTPException(status_code=500, detail="User account is corrupted: invalid password format")
         try:
-            if not verify_password(login_data.password, password_hash):
+            if not await verify_password_async(login_data.password, password_hash):
                 logger.warning(f"Login failed: Invalid password for identifier: {login_data.identifier}")
                 raise HTTPException(status_code=401, detail="Invalid password")
         except ValueError as ve:
             logger.error(f"Password verification failed for {login_data.identifier}: {str(ve)}")
             raise HTTPException(status_code=500, detail="Password verification error")
+        schedule_password_rehash(user["_id"], login_data.password, password_hash)
         
         access_token = create_access_token(data={"sub": user["username"]})
+        refresh_token = await issue_refresh_token(user["_id"], user["username"])
         logger.info(f"Generating token for username: {user['username']}")
         logger.info(f"User logged in successfully: {user['_id']}")
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "user_id": user["_id"]
+            "user_id": user["_id"],
+            "refresh_token": refresh_token,
         }
+    except HTTPException:
+        raise
+    except PasswordPoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Error during login: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Login error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Login error: {str(e)}")
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_access_token(refresh_data: RefreshRequest):
+    """Exchange a refresh token for a new access token and a new refresh token."""
+    try:
+        user_id, username, refresh_token = await rotate_refresh_token(refresh_data.refresh_token)
+    except InvalidRefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except Exception as e:
+        logger.error(f"Error refreshing token: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Refresh error: {str(e)}")
+    return {
+        "access_token": create_access_token(data={"sub": username}),
+        "token_type": "bearer",
+        "user_id": user_id,
+        "refresh_token": refresh_token,
+    }
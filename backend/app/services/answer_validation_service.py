@@ -0,0 +1,100 @@
+from app.core.cache import TTLCache
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+YES_NO = frozenset(["Yes", "No"])
+
+class AnswerValidationError(ValueError):
+    """An answer does not satisfy its custom question; the message is safe to show the user."""
+
+class CompiledQuestion:
+    __slots__ = ("index", "text", "type", "options", "options_text", "integer")
+
+    def __init__(self, index: int, question: dict):
+        self.index = index
+        self.text = question.get("question")
+        self.type = question.get("type", "Question/Answer")
+        options = question.get("options") or []
+        self.options = frozenset(options)
+        self.options_text = ", ".join(options)
+        self.integer = self.type == "Question/Answer" and question.get("answerType") == "Integer"
+
+    def check(self, answer) -> str | None:
+        """Return which rule the answer breaks ("mcq", "yes_no", "integer") or None."""
+        if self.type == "MCQ":
+            try:
+                return None if answer in self.options else "mcq"
+            except TypeError:
+                return "mcq"
+        if self.type == "Yes/No":
+            try:
+                return None if answer in YES_NO else "yes_no"
+            except TypeError:
+                return "yes_no"
+        if self.integer:
+            try:
+                int(answer)
+            except (TypeError, ValueError):
+                return "integer"
+        return None
+
+class AnswerValidator:
+    """
+    The customQuestions of one event version, compiled once: MCQ options become
+    sets and the per-question type checks are decided up front.
+    """
+
+    def __init__(self, custom_questions: list):
+        self.questions = [CompiledQuestion(i, question) for i, question in enumerate(custom_questions or [])]
+
+    def __len__(self):
+        return len(self.questions)
+
+    def validate_indexed(self, answers):
+        """Validate [{index, answer}] answers as sent to /event_registrations."""
+        for item in answers or []:
+            index = item.index if hasattr(item, "index") else item["index"]
+            answer = item.answer if hasattr(item, "answer") else item["answer"]
+            if index < 0 or index >= len(self.questions):
+                raise AnswerValidationError(f"Invalid question index: {index}")
+            problem = self.questions[index].check(answer)
+            if problem == "mcq":
+                raise AnswerValidationError(f"Invalid answer for MCQ question {index}: {answer}")
+            if problem == "yes_no":
+                raise AnswerValidationError(f"Invalid answer for Yes/No question {index}: {answer}")
+            if problem == "integer":
+                raise AnswerValidationError(f"Answer for question {index} must be an integer")
+
+    def validate_by_text(self, custom_answers: dict):
+        """Validate {question text: answer} answers as sent to /events/{id}/register."""
+        for question in self.questions:
+            if question.text not in custom_answers:
+                raise AnswerValidationError(f"Missing answer for: {question.text}")
+            problem = question.check(custom_answers[question.text])
+            if problem == "mcq":
+                raise AnswerValidationError(f"Invalid answer for {question.text}. Allowed: {question.options_text}")
+            if problem == "yes_no":
+                raise AnswerValidationError(f"Invalid answer for {question.text}. Allowed: Yes, No")
+            if problem == "integer":
+                raise AnswerValidationError(f"Answer for {question.text} must be an integer")
+
+# Keyed by (event ID, digest of customQuestions): registrations bump updatedAt on
+# every seat, so only an actual edit of the questions should yield a new entry
+_validator_cache = TTLCache(max_size=1024, ttl_seconds=3600, copy_values=False)
+
+def questions_digest(custom_questions: list) -> str:
+    encoded = json.dumps(custom_questions or [], sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+def get_answer_validator(event: dict) -> AnswerValidator:
+    """Return the compiled validator for the event's current customQuestions."""
+    key = (str(event.get("_id")), questions_digest(event.get("customQuestions")))
+    validator = _validator_cache.get(key)
+    if validator is None:
+        validator = AnswerValidator(event.get("customQuestions"))
+        _validator_cache.set(key, validator)
+        logger.debug(f"Compiled answer validator for event {key[0]} ({len(validator)} questions)")
+    return validator
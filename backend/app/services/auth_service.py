@@ -1,8 +1,8 @@
-from app.password import verify_password
+from app.core.security import verify_password_async
 from app.services.user_service import get_user_by_id
 
 async def authenticate_user(id: str, password: str):
-    user = await get_user_by_id
-    if not user or not verify_password(password, user["password"]):
+    user = await get_user_by_id(id)
+    if not user or not await verify_password_async(password, user["password"]):
         return False
     return user
\ No newline at end of file
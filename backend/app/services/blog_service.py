@@ -1,6 +1,7 @@
-from db import db_client
+from db import get_collection
 from bson.objectid import ObjectId
 from app.models.blog_model import Blog
+from app.services.write_service import insert_document, update_document
 from datetime import datetime
 import pytz
 import logging
@@ -14,10 +15,9 @@ async def create_blog(blog_data: dict):
         logger.info(f"Received blog data: {blog_data}")
         blog = Blog(**blog_data)
         blog_dict = blog.dict(by_alias=True, exclude={"id"})
-        collection = db_client["centerofexcellence"]["blogs"]
-        result = await collection.insert_one(blog_dict)
-        logger.info(f"Created blog with _id: {result.inserted_id}")
-        inserted_blog = await get_blog_by_id(str(result.inserted_id))
+        collection = get_collection("blogs")
+        inserted_blog = await insert_document(collection, blog_dict)
+        logger.info(f"Created blog with _id: {inserted_blog['_id']}")
         return inserted_blog
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
@@ -31,7 +31,7 @@ async def get_blog_by_id(blog_id: str):
         if not ObjectId.is_valid(blog_id):
             logger.error(f"Invalid blog ID format: {blog_id}")
             raise ValueError("Invalid blog ID format")
-        collection = db_client["centerofexcellence"]["blogs"]
+        collection = get_collection("blogs")
         blog = await collection.find_one({"_id": ObjectId(blog_id)})
         if not blog:
             logger.info(f"No blog found with _id: {blog_id}")
@@ -48,7 +48,7 @@ async def get_blog_by_id(blog_id: str):
 
 async def get_all_blogs():
     try:
-        collection = db_client["centerofexcellence"]["blogs"]
+        collection = get_collection("blogs")
         blogs = await collection.find().to_list(None)
         for blog in blogs:
             blog["_id"] = str(blog["_id"])
@@ -63,7 +63,7 @@ async def delete_blog(blog_id: str):
         if not ObjectId.is_valid(blog_id):
             logger.error(f"Invalid blog ID format: {blog_id}")
             raise ValueError("Invalid blog ID format")
-        collection = db_client["centerofexcellence"]["blogs"]
+        collection = get_collection("blogs")
         result = await collection.delete_one({"_id": ObjectId(blog_id)})
         logger.info(f"Delete result for _id {blog_id}: {result.deleted_count} deleted")
         return result
@@ -75,6 +75,7 @@ async def delete_blog(blog_id: str):
         raise Exception(f"Error deleting blog: {str(e)}")
 
 async def modify_blog(blog_id: str, update_data: dict):
+    """Apply update_data and return the updated blog, or None if it does not exist."""
     try:
         if not ObjectId.is_valid(blog_id):
             logger.error(f"Invalid blog ID format: {blog_id}")
@@ -90,13 +91,10 @@ async def modify_blog(blog_id: str, update_data: dict):
             raise ValueError("status must be one of: pending, accepted, rejected")
         update_data["updated_at"] = datetime.now(IST)
         logger.info(f"Updating blog with _id: {blog_id} with data: {update_data}")
-        collection = db_client["centerofexcellence"]["blogs"]
-        result = await collection.update_one(
-            {"_id": ObjectId(blog_id)},
-            {"$set": update_data}
-        )
-        logger.info(f"Update result: {result.matched_count} matched, {result.modified_count} modified")
-        return result
+        collection = get_collection("blogs")
+        updated_blog = await update_document(collection, {"_id": ObjectId(blog_id)}, {"$set": update_data})
+        logger.info(f"Update result for _id {blog_id}: {'updated' if updated_blog else 'not found'}")
+        return updated_blog
     except ValueError as ve:
         logger.error(f"Validation error in modify_blog: {str(ve)}")
         raise
@@ -1,18 +1,32 @@
 try:
-    from ..db import db_client  # Try importing from app/db.py
+    from ..db import get_collection  # Try importing from app/db.py
 except ImportError:
     try:
-        from db import db_client  # Fallback to backend/db.py or root
+        from db import get_collection  # Fallback to backend/db.py or root
     except ImportError:
-        raise ImportError("Cannot import db_client. Ensure db.py exists in app/ or backend/ and is in PYTHONPATH")
+        raise ImportError("Cannot import get_collection. Ensure db.py exists in app/ or backend/ and is in PYTHONPATH")
 
 from bson import ObjectId
 from ..models.event_registration_model import EventRegistration
+from ..core.cache import TTLCache
+from .write_service import insert_document, update_document
+from collections import Counter
+from datetime import datetime
+import csv
+import io
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def create_registration(registration_data: dict) -> str:
+# Per-event answer tallies, recomputed from scratch once an entry expires. There is
+# no incremental watermark: _id and client timestamps are assigned before commit, so
+# a registration that commits late can sort below an already-read watermark.
+analytics_cache = TTLCache(max_size=256, ttl_seconds=60)
+# Free-text questions can have as many distinct answers as registrations
+TOP_FREE_TEXT_ANSWERS = 10
+
+async def create_registration(registration_data: dict) -> dict:
     try:
         logger.info(f"Creating registration with data: {registration_data}")
         # Validate registration data using Pydantic model
@@ -22,10 +36,10 @@ async def create_registration(registration_data: dict) -> str:
         logger.info(f"Registration dict for insertion: {registration_dict}")
         
         # Insert into the database
-        collection = db_client["centerofexcellence"]["event_registration"]
-        result = await collection.insert_one(registration_dict)
-        logger.info(f"Created registration with _id: {result.inserted_id}")
-        return str(result.inserted_id)
+        collection = get_collection("event_registration")
+        created_registration = await insert_document(collection, registration_dict)
+        logger.info(f"Created registration with _id: {created_registration['_id']}")
+        return created_registration
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
         raise ValueError(f"Invalid registration data: {str(ve)}")
@@ -37,37 +51,158 @@ async def get_registration(registration_id: str) -> dict:
     if not ObjectId.is_valid(registration_id):
         logger.error(f"Invalid registration ID: {registration_id}")
         return None
-    collection = db_client["centerofexcellence"]["event_registration"]
+    collection = get_collection("event_registration")
     registration = await collection.find_one({"_id": ObjectId(registration_id)})
     if registration:
         registration["_id"] = str(registration["_id"])
     return registration
 
 async def get_registration_by_event_and_user(event_id: str, user_id: str) -> dict:
-    collection = db_client["centerofexcellence"]["event_registration"]
+    collection = get_collection("event_registration")
     registration = await collection.find_one({"event_id": event_id, "user_id": user_id})
     if registration:
         registration["_id"] = str(registration["_id"])
     return registration
 
 async def get_registrations_by_event(event_id: str) -> list:
-    collection = db_client["centerofexcellence"]["event_registration"]
+    collection = get_collection("event_registration")
     cursor = collection.find({"event_id": event_id})
     registrations = await cursor.to_list(length=None)
     for reg in registrations:
         reg["_id"] = str(reg["_id"])
     return registrations
 
-async def update_registration(event_id: str, user_id: str, update_data: dict):
-    collection = db_client["centerofexcellence"]["event_registration"]
+REGISTRATION_EXPORT_COLUMNS = ["registration_id", "user_id", "created_at"]
+
+def registration_question_columns(custom_questions: list) -> list:
+    """Column names for an event's custom questions, made unique and never blank."""
+    columns = []
+    seen = set(REGISTRATION_EXPORT_COLUMNS)
+    for i, question in enumerate(custom_questions or []):
+        name = (question.get("question") or "").strip() or f"Question {i + 1}"
+        column, n = name, 2
+        while column in seen:
+            column, n = f"{name} ({n})", n + 1
+        seen.add(column)
+        columns.append(column)
+    return columns
+
+def flatten_registration(registration: dict, questions: list) -> dict:
+    """One export row: fixed columns, then one column per custom question keyed by its text."""
+    created_at = registration.get("created_at")
+    row = {
+        "registration_id": str(registration["_id"]),
+        "user_id": registration.get("user_id"),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    }
+    row.update({question: None for question in questions})
+    for answer in registration.get("answers") or []:
+        index = answer.get("index")
+        if isinstance(index, int) and 0 <= index < len(questions):
+            row[questions[index]] = answer.get("answer")
+    return row
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_safe(value):
+    """Quote a user-supplied cell with a leading ' so spreadsheets show it as text."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+async def export_registrations(event_id: str, questions: list, export_format: str = "csv", batch_size: int = 500):
+    """
+    Yield an event's registrations as CSV or NDJSON, one chunk per cursor batch,
+    so memory use does not grow with the number of registrations.
+    """
+    collection = get_collection("event_registration")
+    cursor = collection.find({"event_id": event_id}).batch_size(batch_size)
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(REGISTRATION_EXPORT_COLUMNS + [csv_safe(question) for question in questions])
+    pending = 0
+    async for registration in cursor:
+        row = flatten_registration(registration, questions)
+        if writer:
+            writer.writerow(csv_safe(value) for value in row.values())
+        else:
+            buffer.write(json.dumps(row) + "\n")
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def _tally_answers(event_id: str) -> dict:
+    """Count an event's registrations and (index, answer) pairs."""
+    collection = get_collection("event_registration")
+    pipeline = [
+        {"$match": {"event_id": event_id}},
+        {"$facet": {
+            "meta": [{"$group": {"_id": None, "count": {"$sum": 1}}}],
+            "answers": [
+                {"$unwind": "$answers"},
+                {"$group": {"_id": {"index": "$answers.index", "answer": "$answers.answer"}, "count": {"$sum": 1}}},
+            ],
+        }},
+    ]
+    result = (await collection.aggregate(pipeline).to_list(length=1))[0]
+    total = result["meta"][0]["count"] if result["meta"] else 0
+    counts = {}
+    for row in result["answers"]:
+        counts.setdefault(row["_id"]["index"], Counter())[row["_id"]["answer"]] += row["count"]
+    return {"total": total, "counts": counts}
+
+async def get_answer_analytics(event_id: str, custom_questions: list) -> dict:
+    """
+    Distribution of answers per custom question. Tallies are cached per event
+    for the analytics TTL, so new registrations show up within a minute;
+    edits and deletions drop the cached tally straight away.
+    """
+    tally = analytics_cache.get(event_id)
+    if tally is None:
+        tally = await _tally_answers(event_id)
+        analytics_cache.set(event_id, tally)
+
+    questions = []
+    for index, question in enumerate(custom_questions or []):
+        counts = tally["counts"].get(index, Counter())
+        if question.get("type") == "MCQ":
+            answers = [(option, counts.get(option, 0)) for option in question.get("options") or []]
+        elif question.get("type") == "Yes/No":
+            answers = [(option, counts.get(option, 0)) for option in ("Yes", "No")]
+        else:
+            answers = counts.most_common(TOP_FREE_TEXT_ANSWERS)
+        questions.append({
+            "index": index,
+            "question": question.get("question"),
+            "type": question.get("type"),
+            "responses": sum(counts.values()),
+            "answers": [{"answer": answer, "count": count} for answer, count in answers],
+        })
+    return {"event_id": event_id, "totalRegistrations": tally["total"], "questions": questions}
+
+async def update_registration(event_id: str, user_id: str, update_data: dict) -> dict:
+    """Apply update_data and return the updated registration, or None if there is none."""
+    collection = get_collection("event_registration")
     logger.info(f"Updating registration for event_id: {event_id}, user_id: {user_id} with data: {update_data}")
-    result = await collection.update_one(
-        {"event_id": event_id, "user_id": user_id},
-        {"$set": update_data}
+    updated_registration = await update_document(
+        collection, {"event_id": event_id, "user_id": user_id}, {"$set": update_data}
     )
-    logger.info(f"Update result: {result.matched_count} matched, {result.modified_count} modified")
-    return result
+    logger.info(f"Update result: {'updated' if updated_registration else 'not found'}")
+    if updated_registration and "answers" in update_data:
+        analytics_cache.invalidate(event_id)
+    return updated_registration
 
 async def delete_registration(event_id: str, user_id: str):
-    collection = db_client["centerofexcellence"]["event_registration"]
-    return await collection.delete_one({"event_id": event_id, "user_id": user_id})
\ No newline at end of file
+    collection = get_collection("event_registration")
+    result = await collection.delete_one({"event_id": event_id, "user_id": user_id})
+    if result.deleted_count:
+        analytics_cache.invalidate(event_id)
+    return result
\ No newline at end of file
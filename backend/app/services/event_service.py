@@ -1,29 +1,168 @@
-from db import db_client
+from db import get_database, get_collection
 from bson.objectid import ObjectId
 from app.models.event_model import Event
+from pydantic import ValidationError
+from app.core.cache import TTLCache
+from app.services.search_service import event_search_index
+from app.services.job_service import update_job_progress
+from app.services.upload_service import release_uploads
+from app.services.write_service import insert_document, update_document
+from app.config import settings
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+import base64
+import calendar
+import json
 
 logger = logging.getLogger(__name__)
 
-async def create_event(event_data: dict):
+# Per-process cache of event documents keyed by event ID; every write below invalidates it
+event_cache = TTLCache(max_size=settings.EVENT_CACHE_MAX_SIZE, ttl_seconds=settings.EVENT_CACHE_TTL_SECONDS)
+# Facet query results keyed by filters and page; cleared on every event write
+facet_cache = TTLCache(max_size=256, ttl_seconds=settings.EVENT_CACHE_TTL_SECONDS)
+
+# Facet name -> event field it counts and filters on
+EVENT_FACETS = {
+    "category": "category",
+    "tag": "tags",
+    "month": "month",
+    "year": "year",
+    "status": "status",
+    "eventMode": "eventMode",
+}
+
+def invalidate_event(event_id: str, fields=None):
+    """
+    Drop everything cached for an event after it was written. fields names what
+    changed (None for a created or deleted event); facet pages are only cleared
+    when one of FACET_PAGE_FIELDS is among them.
+    """
+    event_cache.invalidate(event_id)
+    if fields is None or not FACET_PAGE_FIELDS.isdisjoint(fields):
+        facet_cache.clear()
+
+# Fields returned for the lightweight "card" view of an event (see EventCard)
+EVENT_CARD_PROJECTION = {
+    "eventName": 1,
+    "tagline": 1,
+    "category": 1,
+    "tags": 1,
+    "date": 1,
+    "month": 1,
+    "year": 1,
+    "location": 1,
+    "capacity": 1,
+    "eventMode": 1,
+    "bannerImage": 1,
+    "thumbnailImage": 1,
+    "bannerImageVariants": 1,
+    "thumbnailImageVariants": 1,
+    "organizer": 1,
+    "status": 1,
+    "totalRegistrations": 1,
+    "startsAt": 1,
+    "createdAt": 1,
+}
+
+# Fields a cached facet page depends on: what it filters, counts and sorts on and
+# what its cards show. totalRegistrations is left out, so registrations do not
+# clear it and card counters may lag by up to the cache TTL
+FACET_PAGE_FIELDS = frozenset(EVENT_CARD_PROJECTION) - {"totalRegistrations"}
+
+# Accepted values of the `sort` listing parameter; a leading "-" means descending
+EVENT_SORT_FIELDS = ("createdAt", "startsAt")
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+
+def parse_event_start(date, month, year) -> datetime | None:
+    """
+    Combine the legacy date/month/year strings into one datetime. Months may be
+    numbers ("5"), full names ("May") or abbreviations ("Jun"), in any case.
+    Returns None when the parts do not form a valid date.
+    """
     try:
-        logger.info(f"Received event data: {event_data}")
-        # Validate event data using Pydantic model
-        event = Event(**event_data)
-        # Convert to dict, explicitly exclude '_id' and 'id' to prevent conflicts
-        event_dict = event.dict(by_alias=True, exclude_unset=True, exclude={"_id", "id"})
-        # Set createdAt and updatedAt
-        current_time = datetime.utcnow()
+        month_text = str(month).strip().lower()
+        month_number = int(month_text) if month_text.isdigit() else _MONTHS[month_text]
+        return datetime(int(str(year).strip()), month_number, int(str(date).strip()))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def encode_event_cursor(event: dict, sort_field: str = "createdAt") -> str:
+    """
+    Build the opaque `after` token pointing just past the given event. Events
+    without the sort field (created before it existed) carry a null value and
+    are ordered among themselves by _id alone.
+    """
+    sort_value = event.get(sort_field)
+    payload = {"s": sort_field, "c": sort_value.isoformat() if sort_value else None, "i": str(event["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_event_cursor(cursor: str, sort_field: str = "createdAt") -> tuple:
+    """Decode an `after` token into its (sort value or None, ObjectId) key."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload.get("s", "createdAt") != sort_field:
+            raise ValueError
+        sort_value = datetime.fromisoformat(payload["c"]) if payload["c"] is not None else None
+        if not ObjectId.is_valid(payload["i"]):
+            raise ValueError
+        return sort_value, ObjectId(payload["i"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def parse_event_sort(sort: str) -> tuple:
+    """Split a sort parameter such as "-startsAt" into ("startsAt", -1)."""
+    field = sort.lstrip("-")
+    if field not in EVENT_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(EVENT_SORT_FIELDS)} (optionally prefixed with -)")
+    return field, -1 if sort.startswith("-") else 1
+
+def starts_at_filter(starts_after: datetime | None = None, starts_before: datetime | None = None) -> dict:
+    """Mongo filter restricting startsAt to [starts_after, starts_before)."""
+    if starts_after is None and starts_before is None:
+        return {}
+    bounds = {}
+    if starts_after is not None:
+        bounds["$gte"] = starts_after
+    if starts_before is not None:
+        bounds["$lt"] = starts_before
+    return {"startsAt": bounds}
+
+def prepare_event_document(event_data: dict, keep_timestamps: bool = False) -> dict:
+    """
+    Validate event_data with the Event model and return the document to insert.
+    Raises pydantic's ValidationError (a ValueError) on invalid data.
+    """
+    event = Event(**event_data)
+    # Convert to dict, explicitly exclude '_id' and 'id' to prevent conflicts
+    event_dict = event.dict(by_alias=True, exclude_unset=True, exclude={"_id", "id"})
+    # Set createdAt and updatedAt (imports may carry their own)
+    current_time = datetime.utcnow()
+    if not keep_timestamps or "createdAt" not in event_dict:
         event_dict["createdAt"] = current_time
+    if not keep_timestamps or "updatedAt" not in event_dict:
         event_dict["updatedAt"] = current_time
+    event_dict["startsAt"] = parse_event_start(event.date, event.month, event.year)
+    return event_dict
+
+async def create_event(event_data: dict):
+    try:
+        logger.info(f"Received event data: {event_data}")
+        event_dict = prepare_event_document(event_data)
         logger.debug(f"Event dict for insertion: {event_dict}")
         
         # Insert into the database
-        collection = db_client["centerofexcellence"]["events"]
-        result = await collection.insert_one(event_dict)
-        logger.info(f"Created event with _id: {result.inserted_id}")
-        return str(result.inserted_id)
+        collection = get_collection("events")
+        created_event = await insert_document(collection, event_dict)
+        invalidate_event(created_event["_id"])
+        event_cache.set(created_event["_id"], created_event)
+        event_search_index.upsert(created_event)
+        logger.info(f"Created event with _id: {created_event['_id']}")
+        return created_event
     
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}", exc_info=True)
@@ -39,12 +178,18 @@ async def get_event_by_id(event_id: str):
             logger.error(f"Invalid event ID format: {event_id}")
             raise ValueError("Invalid event ID format")
         
-        collection = db_client["centerofexcellence"]["events"]
+        event = event_cache.get(event_id)
+        if event is not None:
+            logger.debug(f"Event cache hit for _id: {event_id}")
+            return event
+
+        collection = get_collection("events")
         event = await collection.find_one({"_id": ObjectId(event_id)})
         
         if event:
             # Convert _id to string for JSON response
             event["_id"] = str(event["_id"])
+            event_cache.set(event_id, event)
             logger.info(f"Retrieved event with _id: {event_id}")
         return event
     
@@ -57,7 +202,7 @@ async def get_event_by_id(event_id: str):
 
 async def get_event_by_name(event_name: str):
     try:
-        collection = db_client["centerofexcellence"]["events"]
+        collection = get_collection("events")
         event = await collection.find_one({"eventName": event_name})
         
         if event:
@@ -72,7 +217,7 @@ async def get_event_by_name(event_name: str):
 
 async def get_all_events():
     try:
-        collection = db_client["centerofexcellence"]["events"]
+        collection = get_collection("events")
         cursor = collection.find({})
         events = []
         async for event in cursor:
@@ -84,14 +229,74 @@ async def get_all_events():
         logger.error(f"Error retrieving all events: {str(e)}", exc_info=True)
         raise Exception(f"Error retrieving events: {str(e)}")
 
+async def get_events_page(
+    limit: int | None,
+    after: str | None = None,
+    projection: dict | None = None,
+    sort: str = "-createdAt",
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+):
+    """
+    Return one page of events plus the cursor for the next page. Pages are keyed
+    on (sort field, _id) so each page is a bounded index range scan; sorting by
+    startsAt only lists events that have a start date. With no limit every
+    matching event is returned and there is no next cursor.
+    """
+    try:
+        sort_field, direction = parse_event_sort(sort)
+        conditions = []
+        range_filter = starts_at_filter(starts_after, starts_before)
+        if range_filter:
+            conditions.append(range_filter)
+        if sort_field == "startsAt":
+            conditions.append({"startsAt": {"$ne": None}})
+        if after:
+            sort_value, last_id = decode_event_cursor(after, sort_field)
+            past = "$lt" if direction == -1 else "$gt"
+            branches = [{sort_field: sort_value, "_id": {past: last_id}}]
+            # Missing values sort before every date: ascending pages move from the
+            # undated events on to the dated ones, descending pages end with them
+            if sort_value is not None:
+                branches.append({sort_field: {past: sort_value}})
+                if direction == -1:
+                    branches.append({sort_field: None})
+            elif direction == 1:
+                branches.append({sort_field: {"$ne": None}})
+            conditions.append({"$or": branches})
+        query = {"$and": conditions} if conditions else {}
+        collection = get_collection("events")
+        cursor = collection.find(query, projection).sort([(sort_field, direction), ("_id", direction)])
+        if limit is None:
+            events = await cursor.to_list(length=None)
+        else:
+            # Fetch one extra document to know whether another page exists
+            events = await cursor.limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = None
+        if limit is not None and len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_event_cursor(events[-1], sort_field)
+        for event in events:
+            event["_id"] = str(event["_id"])
+        logger.info(f"Retrieved page of {len(events)} events (sort={sort}, after={after})")
+        return events, next_cursor
+    except ValueError as ve:
+        logger.error(f"Validation error in get_events_page: {str(ve)}")
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving events page: {str(e)}", exc_info=True)
+        raise Exception(f"Error retrieving events: {str(e)}")
+
 async def delete_event(event_id: str):
     try:
         if not ObjectId.is_valid(event_id):
             logger.error(f"Invalid event ID format: {event_id}")
             raise ValueError("Invalid event ID format")
         
-        collection = db_client["centerofexcellence"]["events"]
+        collection = get_collection("events")
         result = await collection.delete_one({"_id": ObjectId(event_id)})
+        invalidate_event(event_id)
+        event_search_index.remove(event_id)
         logger.info(f"Delete result for _id {event_id}: {result.deleted_count} deleted")
         return result
     
@@ -102,47 +307,60 @@ async def delete_event(event_id: str):
         logger.error(f"Error deleting event with _id {event_id}: {str(e)}", exc_info=True)
         raise Exception(f"Error deleting event: {str(e)}")
 
-async def modify_event(event_id: str, update_data: dict):
-    try:
-        if not ObjectId.is_valid(event_id):
-            logger.error(f"Invalid event ID format: {event_id}")
-            raise ValueError("Invalid event ID format")
-
-        # Validate eventMode if provided
-        if "eventMode" in update_data and update_data["eventMode"] not in ["virtual", "physical"]:
-            logger.error(f"Invalid eventMode in update: {update_data['eventMode']}")
-            raise ValueError("eventMode must be one of: virtual, physical")
+async def cascade_delete_event(event_id: str, job_id: str, upload_paths: list = (), batch_size: int = 500):
+    """
+    Remove what a deleted event leaves behind, batch_size documents at a time:
+    its event_registration rows and the eventsRegistered entries embedded in
+    users. The references held by upload_paths (the event's own images) and by
+    the removed registrations' resumes are released; the files themselves are
+    left to the upload GC. Progress is recorded on the job.
+    """
+    database = get_database()
 
-        # Validate capacity if provided and eventMode is physical
-        if "eventMode" in update_data and update_data["eventMode"] == "physical":
-            if "capacity" not in update_data or update_data["capacity"] is None:
-                logger.error("capacity is required for physical events")
-                raise ValueError("capacity is required for physical events")
-            if update_data["capacity"] <= 0:
-                logger.error(f"Invalid capacity in update: {update_data['capacity']}")
-                raise ValueError("capacity must be a positive integer for physical events")
+    await update_job_progress(job_id, stage="registrations", registrationsDeleted=0)
+    registrations_deleted = 0
+    while True:
+        batch = await database["event_registration"].find(
+            {"event_id": event_id}, {"_id": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        result = await database["event_registration"].delete_many({"_id": {"$in": [row["_id"] for row in batch]}})
+        registrations_deleted += result.deleted_count
+        await update_job_progress(job_id, registrationsDeleted=registrations_deleted)
 
-        # Add updatedAt to update_data
-        update_data["updatedAt"] = datetime.utcnow()
-        
-        logger.info(f"Updating event with _id: {event_id} with data: {update_data}")
-        collection = db_client["centerofexcellence"]["events"]
-        result = await collection.update_one(
-            {"_id": ObjectId(event_id)},
-            {"$set": update_data}
+    await update_job_progress(job_id, stage="users", usersUpdated=0)
+    users_updated = 0
+    resumes = []
+    while True:
+        batch = await database["user"].find(
+            {"eventsRegistered.eventId": event_id}, {"eventsRegistered.eventId": 1, "eventsRegistered.resume": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        result = await database["user"].update_many(
+            {"_id": {"$in": [user["_id"] for user in batch]}},
+            {"$pull": {"eventsRegistered": {"eventId": event_id}}, "$set": {"updatedAt": datetime.utcnow()}},
         )
-        
-        logger.info(f"Update result: {result.matched_count} matched, {result.modified_count} modified")
-        return result
-    
-    except ValueError as ve:
-        logger.error(f"Validation error in modify_event: {str(ve)}")
-        raise
-    except Exception as e:
-        logger.error(f"Error updating event with _id {event_id}: {str(e)}", exc_info=True)
-        raise Exception(f"Error updating event: {str(e)}")
-    # In event_service.py, modify the modify_event function to add logging for registration updates
+        users_updated += result.modified_count
+        resumes.extend(
+            registration.get("resume")
+            for user in batch
+            for registration in user.get("eventsRegistered") or []
+            if registration.get("eventId") == event_id
+        )
+        await update_job_progress(job_id, usersUpdated=users_updated)
+
+    await update_job_progress(job_id, stage="uploads")
+    uploads_released = await release_uploads([*upload_paths, *resumes])
+    await update_job_progress(job_id, stage="done", uploadsReleased=uploads_released)
+    logger.info(
+        f"Cascade for event {event_id}: {registrations_deleted} registrations deleted, "
+        f"{users_updated} users updated, {uploads_released} uploads released"
+    )
+
 async def modify_event(event_id: str, update_data: dict):
+    """Apply update_data and return the updated event, or None if it does not exist."""
     try:
         if not ObjectId.is_valid(event_id):
             logger.error(f"Invalid event ID format: {event_id}")
@@ -176,22 +394,411 @@ async def modify_event(event_id: str, update_data: dict):
                 logger.error("totalRegistrations must be a non-negative integer")
                 raise ValueError("totalRegistrations must be a non-negative integer")
 
+        # Keep startsAt in sync with the date/month/year strings
+        if any(part in update_data for part in ("date", "month", "year")):
+            parts = update_data
+            if not all(part in update_data for part in ("date", "month", "year")):
+                current = await get_event_by_id(event_id) or {}
+                parts = {**current, **update_data}
+            update_data["startsAt"] = parse_event_start(parts.get("date"), parts.get("month"), parts.get("year"))
+
         # Add updatedAt to update_data
         update_data["updatedAt"] = datetime.utcnow()
         
         logger.info(f"Updating event with _id: {event_id} with data: {update_data}")
-        collection = db_client["centerofexcellence"]["events"]
-        result = await collection.update_one(
-            {"_id": ObjectId(event_id)},
-            {"$set": update_data}
-        )
-        
-        logger.info(f"Update result: {result.matched_count} matched, {result.modified_count} modified")
-        return result
+        collection = get_collection("events")
+        updated_event = await update_document(collection, {"_id": ObjectId(event_id)}, {"$set": update_data})
+        invalidate_event(event_id, update_data)
+        if updated_event:
+            event_cache.set(event_id, updated_event)
+            event_search_index.update_fields(event_id, update_data)
+
+        logger.info(f"Update result for _id {event_id}: {'updated' if updated_event else 'not found'}")
+        return updated_event
     
     except ValueError as ve:
         logger.error(f"Validation error in modify_event: {str(ve)}")
         raise
     except Exception as e:
         logger.error(f"Error updating event with _id {event_id}: {str(e)}", exc_info=True)
-        raise Exception(f"Error updating event: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error updating event: {str(e)}")
+
+PARTICIPANT_PROJECTION = {"username": 1, "email": 1, "phone": 1, "profilePic": 1, "eventsRegistered.eventId": 1, "eventsRegistered.registeredAt": 1}
+
+async def get_event_participants(event_id: str, limit: int = 100, after: str = None):
+    """
+    One page of an event's roster, built from its registeredUsers with a single
+    $in query on user in _id order after the cursor. Returns (participants,
+    next_cursor), or None when the event does not exist.
+    """
+    if after and not ObjectId.is_valid(after):
+        raise ValueError("Invalid cursor")
+    event = await get_event_by_id(event_id)
+    if event is None:
+        return None
+    user_ids = [ObjectId(user_id) for user_id in event.get("registeredUsers") or [] if ObjectId.is_valid(user_id)]
+    if not user_ids:
+        return [], None
+    query = {"_id": {"$in": user_ids}}
+    if after:
+        query["_id"]["$gt"] = ObjectId(after)
+    cursor = get_collection("user").find(query, PARTICIPANT_PROJECTION).sort("_id", 1).limit(limit + 1)
+    page = await cursor.to_list(length=limit + 1)
+    next_cursor = str(page[limit - 1]["_id"]) if len(page) > limit else None
+
+    participants = []
+    for user in page[:limit]:
+        registration = next(
+            (entry for entry in user.get("eventsRegistered") or [] if entry.get("eventId") == event_id), {}
+        )
+        participants.append({
+            "id": str(user["_id"]),
+            "name": user.get("username"),
+            "email": user.get("email"),
+            "phone": user.get("phone"),
+            "image": user.get("profilePic"),
+            "registeredOn": registration.get("registeredAt"),
+        })
+    return participants, next_cursor
+
+async def search_events(query: str, offset: int = 0, limit: int = 20):
+    """
+    Rank events matching query with the in-memory search index and return
+    (page of event cards, total number of matches).
+    """
+    try:
+        await event_search_index.ensure_fresh()
+        collection = get_collection("events")
+        while True:
+            ranked_ids = event_search_index.search(query)
+            page_ids = ranked_ids[offset:offset + limit]
+            cursor = collection.find({"_id": {"$in": [ObjectId(event_id) for event_id in page_ids]}}, EVENT_CARD_PROJECTION)
+            events_by_id = {}
+            async for event in cursor:
+                event["_id"] = str(event["_id"])
+                events_by_id[event["_id"]] = event
+            # Hits deleted by another worker leave the index and the page is refilled
+            dead_ids = [event_id for event_id in page_ids if event_id not in events_by_id]
+            if not dead_ids:
+                break
+            for event_id in dead_ids:
+                event_search_index.remove(event_id)
+            logger.info(f"Dropped {len(dead_ids)} deleted events from the search index")
+        events = [events_by_id[event_id] for event_id in page_ids]
+        logger.info(f"Search '{query}' matched {len(ranked_ids)} events")
+        return events, len(ranked_ids)
+    except Exception as e:
+        logger.error(f"Error searching events for '{query}': {str(e)}", exc_info=True)
+        raise Exception(f"Error searching events: {str(e)}")
+
+async def get_event_facets(
+    filters: dict,
+    offset: int = 0,
+    limit: int = 20,
+    sort: str = "-createdAt",
+    starts_after: datetime | None = None,
+    starts_before: datetime | None = None,
+) -> dict:
+    """
+    Filter events by facet values and count every facet in one aggregation.
+    Each facet is counted with all other filters applied but not its own, so
+    the client can offer alternatives for a facet that is already selected.
+    Returns {"items": [...], "total": int, "facets": {name: [{"value", "count"}]}}.
+    """
+    filters = {name: value for name, value in filters.items() if name in EVENT_FACETS and value is not None}
+    sort_field, direction = parse_event_sort(sort)
+    cache_key = (tuple(sorted(filters.items())), offset, limit, sort, starts_after, starts_before)
+    cached = facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    range_filter = starts_at_filter(starts_after, starts_before)
+
+    def match(excluding: str = None) -> dict:
+        conditions = {EVENT_FACETS[name]: value for name, value in filters.items() if name != excluding}
+        return {**conditions, **range_filter}
+
+    try:
+        branches = {
+            "items": [
+                {"$match": match()},
+                {"$sort": {sort_field: direction, "_id": direction}},
+                {"$skip": offset},
+                {"$limit": limit},
+                {"$project": EVENT_CARD_PROJECTION},
+            ],
+            "total": [{"$match": match()}, {"$count": "count"}],
+        }
+        for name, field in EVENT_FACETS.items():
+            branch = [{"$match": match(excluding=name)}]
+            if field == "tags":
+                branch.append({"$unwind": "$tags"})
+            branch += [
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+            ]
+            branches[f"facet_{name}"] = branch
+
+        collection = get_collection("events")
+        result = (await collection.aggregate([{"$facet": branches}]).to_list(length=1))[0]
+        for event in result["items"]:
+            event["_id"] = str(event["_id"])
+        page = {
+            "items": result["items"],
+            "total": result["total"][0]["count"] if result["total"] else 0,
+            "facets": {
+                name: [{"value": str(bucket["_id"]), "count": bucket["count"]} for bucket in result[f"facet_{name}"] if bucket["_id"] is not None]
+                for name in EVENT_FACETS
+            },
+        }
+        facet_cache.set(cache_key, page)
+        logger.info(f"Computed event facets for filters {filters}: {page['total']} matches")
+        return page
+    except Exception as e:
+        logger.error(f"Error computing event facets: {str(e)}", exc_info=True)
+        raise Exception(f"Error retrieving event facets: {str(e)}")
+
+async def backfill_event_start_times(batch_size: int = 500) -> int:
+    """
+    Set startsAt on events written before it existed, batch_size documents per
+    bulk write. Events whose date cannot be parsed get startsAt = None so they
+    are not picked up again. Returns the number of events updated.
+    """
+    try:
+        collection = get_collection("events")
+        updated = 0
+        while True:
+            batch = await collection.find(
+                {"startsAt": {"$exists": False}}, {"date": 1, "month": 1, "year": 1}
+            ).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+            operations = [
+                UpdateOne(
+                    {"_id": event["_id"]},
+                    {"$set": {"startsAt": parse_event_start(event.get("date"), event.get("month"), event.get("year"))}},
+                )
+                for event in batch
+            ]
+            result = await collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+            for event in batch:
+                invalidate_event(str(event["_id"]), ("startsAt",))
+        if updated:
+            logger.info(f"Backfilled startsAt on {updated} events")
+        return updated
+    except Exception as e:
+        logger.error(f"Error backfilling event start times: {str(e)}", exc_info=True)
+        raise Exception(f"Error backfilling event start times: {str(e)}")
+
+# Events carry only a start date, so each one is treated as lasting this long
+EVENT_DURATION = timedelta(days=1)
+
+async def _move_events_to_status(query: dict, new_status: str, now: datetime) -> list:
+    collection = get_collection("events")
+    events = await collection.find(query, {"_id": 1}).to_list(length=None)
+    if not events:
+        return []
+    ids = [event["_id"] for event in events]
+    # Mongo keeps milliseconds, so stamp with a value that compares equal on the way back
+    stamp = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    # Re-check the query so an event changed meanwhile is not moved twice
+    await collection.update_many(
+        {"_id": {"$in": ids}, **query},
+        {"$set": {"status": new_status, "updatedAt": stamp}},
+    )
+    # Only the events this call actually moved carry its stamp; anything another
+    # worker or an edit got to first is left for whoever changed it
+    moved = await collection.find(
+        {"_id": {"$in": ids}, "status": new_status, "updatedAt": stamp},
+        {"eventName": 1},
+    ).to_list(length=None)
+    for event in moved:
+        event["_id"] = str(event["_id"])
+        invalidate_event(event["_id"], ("status",))
+    logger.info(f"Moved {len(moved)} events to {new_status}")
+    return [{"_id": event["_id"], "eventName": event.get("eventName"), "status": new_status} for event in moved]
+
+async def transition_event_statuses(now: datetime | None = None) -> list:
+    """
+    Move upcoming events whose start time has passed to "ongoing", and upcoming
+    or ongoing events older than EVENT_DURATION to "completed", using the
+    status/startsAt index. Returns the events that changed with their new status.
+    """
+    now = now or datetime.utcnow()
+    try:
+        completed = await _move_events_to_status(
+            {"status": {"$in": ["upcoming", "ongoing"]}, "startsAt": {"$lte": now - EVENT_DURATION}},
+            "completed",
+            now,
+        )
+        started = await _move_events_to_status(
+            {"status": "upcoming", "startsAt": {"$lte": now}},
+            "ongoing",
+            now,
+        )
+        return completed + started
+    except Exception as e:
+        logger.error(f"Error transitioning event statuses: {str(e)}", exc_info=True)
+        raise Exception(f"Error transitioning event statuses: {str(e)}")
+
+async def import_events(lines, batch_size: int = 500) -> dict:
+    """
+    Import events from an async iterable of NDJSON lines (bytes or str). Each
+    line is validated on its own; a ValueError in place of a line is reported
+    as that line's error; valid events are inserted in unordered bulk
+    batches. An `_id` in a record is kept, so re-importing an export reports
+    duplicates instead of copying events. Returns {"inserted": n, "failed": n, "errors": [{"line", "error"}]}.
+    """
+    collection = get_collection("events")
+    summary = {"inserted": 0, "failed": 0, "errors": []}
+    batch = []  # (line number, document)
+
+    def fail(line_number: int, error: str):
+        summary["failed"] += 1
+        summary["errors"].append({"line": line_number, "error": error})
+
+    async def flush():
+        if not batch:
+            return
+        documents = [document for _, document in batch]
+        try:
+            result = await collection.insert_many(documents, ordered=False)
+            inserted_ids = result.inserted_ids
+        except BulkWriteError as bwe:
+            failed_indexes = set()
+            for write_error in bwe.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                fail(batch[write_error["index"]][0], write_error.get("errmsg", "Write failed"))
+            inserted_ids = [document["_id"] for i, document in enumerate(documents) if i not in failed_indexes]
+        summary["inserted"] += len(inserted_ids)
+        inserted = set(inserted_ids)
+        for document in documents:
+            if document.get("_id") in inserted:
+                event_search_index.upsert(document)
+        facet_cache.clear()
+        batch.clear()
+
+    try:
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if isinstance(line, ValueError):
+                fail(line_number, str(line))
+                continue
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Each line must be a JSON object")
+                batch.append((line_number, prepare_event_document(record, keep_timestamps=True)))
+            except ValidationError as ve:
+                fail(line_number, "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in ve.errors()))
+                continue
+            except ValueError as ve:
+                fail(line_number, str(ve))
+                continue
+            if len(batch) >= batch_size:
+                await flush()
+        await flush()
+        logger.info(f"Imported {summary['inserted']} events, {summary['failed']} failed")
+        return summary
+    except Exception as e:
+        logger.error(f"Error importing events: {str(e)}", exc_info=True)
+        raise Exception(f"Error importing events: {str(e)}")
+
+async def export_events(batch_size: int = 500):
+    """Yield every event as one NDJSON line, reading the cursor batch by batch."""
+    collection = get_collection("events")
+    cursor = collection.find({}).sort([("createdAt", 1), ("_id", 1)]).batch_size(batch_size)
+    async for event in cursor:
+        event["_id"] = str(event["_id"])
+        yield json.dumps(event, default=_json_default) + "\n"
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def get_event_cache_stats() -> dict:
+    """Hit/miss counters and occupancy of the in-process event cache."""
+    return event_cache.stats()
+
+async def register_user_for_event(event_id: str, user_id: str) -> str:
+    """
+    Atomically add user_id to an event's registeredUsers and bump totalRegistrations.
+    The update only matches while the event is upcoming, has room and does not already
+    list the user, so concurrent registrations cannot lose writes or overfill the event.
+    Returns "registered", or why it did not match: "not_found", "closed",
+    "already_registered" or "full".
+    """
+    try:
+        if not ObjectId.is_valid(event_id):
+            logger.error(f"Invalid event ID format: {event_id}")
+            raise ValueError("Invalid event ID format")
+
+        collection = get_collection("events")
+        result = await collection.update_one(
+            {
+                "_id": ObjectId(event_id),
+                "status": "upcoming",
+                "registeredUsers": {"$ne": user_id},
+                "$or": [
+                    {"capacity": None},
+                    {"$expr": {"$lt": [{"$ifNull": ["$totalRegistrations", 0]}, "$capacity"]}},
+                ],
+            },
+            {
+                "$addToSet": {"registeredUsers": user_id},
+                "$inc": {"totalRegistrations": 1},
+                "$set": {"updatedAt": datetime.utcnow()},
+            },
+        )
+        invalidate_event(event_id, ("registeredUsers", "totalRegistrations"))
+        if result.modified_count == 1:
+            logger.info(f"Registered user {user_id} for event {event_id}")
+            return "registered"
+
+        # The guarded update did not match; work out which guard rejected it
+        event = await collection.find_one(
+            {"_id": ObjectId(event_id)},
+            {"status": 1, "capacity": 1, "totalRegistrations": 1},
+        )
+        if not event:
+            return "not_found"
+        if event.get("status") != "upcoming":
+            return "closed"
+        if await collection.count_documents({"_id": ObjectId(event_id), "registeredUsers": user_id}, limit=1):
+            return "already_registered"
+        logger.info(f"Event {event_id} is full ({event.get('totalRegistrations')}/{event.get('capacity')})")
+        return "full"
+
+    except ValueError as ve:
+        logger.error(f"Validation error in register_user_for_event: {str(ve)}")
+        raise
+    except Exception as e:
+        logger.error(f"Error registering user {user_id} for event {event_id}: {str(e)}", exc_info=True)
+        raise Exception(f"Error registering for event: {str(e)}")
+
+async def release_event_seat(event_id: str, user_id: str) -> bool:
+    """
+    Undo register_user_for_event when the rest of the registration failed, so a
+    retry is not answered with "already registered". Returns whether a seat was freed.
+    """
+    collection = get_collection("events")
+    result = await collection.update_one(
+        {"_id": ObjectId(event_id), "registeredUsers": user_id},
+        {
+            "$pull": {"registeredUsers": user_id},
+            "$inc": {"totalRegistrations": -1},
+            "$set": {"updatedAt": datetime.utcnow()},
+        },
+    )
+    invalidate_event(event_id, ("registeredUsers", "totalRegistrations"))
+    if result.modified_count:
+        logger.info(f"Released seat of user {user_id} on event {event_id}")
+    return bool(result.modified_count)
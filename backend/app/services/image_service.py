@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from app.config import settings
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import uuid
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+DERIVATIVE_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+DERIVED_ROOT = Path("uploads") / "derived"
+
+_pool = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: a fork of this process could inherit locks held by
+        # Motor's and the password pool's threads and hang on them
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def derived_dir(source_path: str) -> Path:
+    """Derivatives of a content-addressed upload live under uploads/derived/<digest>/."""
+    return DERIVED_ROOT / Path(source_path).stem
+
+def _render_derivatives(source_path: str, out_dir: str) -> dict:
+    """
+    Resize source_path to every DERIVATIVE_WIDTH narrower than the original and
+    save each as WebP and JPEG. Runs inside the process pool; files that already
+    exist are reused rather than re-encoded. Each file is written under a temporary
+    name and renamed into place, since variants are served as immutable and a
+    half-written one would stay cached.
+    """
+    from PIL import Image, ImageOps
+
+    variants = {}
+    out = Path(out_dir)
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        for width in DERIVATIVE_WIDTHS:
+            if width >= image.width:
+                continue
+            height = round(image.height * width / image.width)
+            resized = None
+            for extension, image_format in DERIVATIVE_FORMATS.items():
+                target = out / f"{width}.{extension}"
+                if not target.exists():
+                    if resized is None:
+                        resized = image.resize((width, height), Image.LANCZOS)
+                    out.mkdir(parents=True, exist_ok=True)
+                    frame = resized if image_format == "WEBP" or resized.mode == "RGB" else resized.convert("RGB")
+                    temp = out / f".{target.name}.{uuid.uuid4().hex}.tmp"
+                    try:
+                        frame.save(temp, image_format, quality=80)
+                        os.replace(temp, target)
+                    except BaseException:
+                        temp.unlink(missing_ok=True)
+                        raise
+                variants[f"{width}.{extension}"] = str(target)
+    return variants
+
+async def generate_derivatives(source_path: str | None) -> dict | None:
+    """
+    Produce the resized variants of an uploaded image in the process pool and
+    return {"<width>.<ext>": path}. Returns None for missing or non-image files.
+    """
+    if not source_path:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        variants = await loop.run_in_executor(
+            _get_pool(), _render_derivatives, source_path, str(derived_dir(source_path))
+        )
+    except Exception as e:
+        logger.warning(f"Could not generate image variants for {source_path}: {str(e)}")
+        return None
+    logger.debug(f"Generated {len(variants)} image variants for {source_path}")
+    return variants
+
+async def remove_derivatives(source_path: str):
+    await asyncio.to_thread(shutil.rmtree, derived_dir(source_path), True)
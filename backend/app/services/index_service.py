@@ -0,0 +1,94 @@
+from db import get_database, get_collection
+from pymongo import ASCENDING, DESCENDING, IndexModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Indexes the services rely on, per collection. Unique indexes back the duplicate
+# checks done by hand in create_user and subscribe_user.
+REQUIRED_INDEXES = {
+    "events": [
+        IndexModel([("eventName", ASCENDING)], name="eventName_1"),
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)], name="createdAt_-1__id_-1"),
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt_1"),
+        IndexModel([("startsAt", ASCENDING), ("_id", ASCENDING)], name="startsAt_1__id_1"),
+        IndexModel([("status", ASCENDING), ("startsAt", ASCENDING)], name="status_1_startsAt_1"),
+    ],
+    "event_registration": [
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)], name="event_id_1_user_id_1"),
+    ],
+    "notifications": [
+        IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING)], name="event_id_1_created_at_-1"),
+    ],
+    "user": [
+        IndexModel([("username", ASCENDING)], name="username_1", unique=True),
+        IndexModel([("eventsRegistered.eventId", ASCENDING)], name="eventsRegistered.eventId_1"),
+        # email is optional on User, so only enforce uniqueness where it is set
+        IndexModel(
+            [("email", ASCENDING)],
+            name="email_1",
+            unique=True,
+            partialFilterExpression={"email": {"$type": "string"}},
+        ),
+    ],
+    "newsletter": [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+    ],
+    "uploads": [
+        IndexModel([("path", ASCENDING)], name="path_1", unique=True),
+    ],
+    "refresh_tokens": [
+        IndexModel([("token_hash", ASCENDING)], name="token_hash_1", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id_1"),
+        IndexModel([("family", ASCENDING)], name="family_1"),
+        # Mongo removes each token once its expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_1", expireAfterSeconds=0),
+    ],
+}
+
+async def ensure_indexes() -> dict:
+    """
+    Create any required index that is missing and report what changed.
+    Returns {"created": [...], "failed": [...], "unused": [...]} with "collection.index" names.
+    """
+    database = get_database()
+    report = {"created": [], "failed": [], "unused": []}
+
+    for collection_name, models in REQUIRED_INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        existing_keys = {tuple(info["key"]) for info in existing.values()}
+
+        for model in models:
+            if tuple(model.document["key"].items()) in existing_keys:
+                continue
+            name = model.document["name"]
+            try:
+                await collection.create_indexes([model])
+                report["created"].append(f"{collection_name}.{name}")
+                logger.info(f"Created missing index {collection_name}.{name}")
+            except Exception as e:
+                # Most likely existing duplicates blocking a unique index
+                report["failed"].append(f"{collection_name}.{name}")
+                logger.error(f"Could not create index {collection_name}.{name}: {str(e)}")
+
+        report["unused"].extend(await find_unused_indexes(collection_name))
+
+    if report["unused"]:
+        logger.info(f"Indexes with no recorded use since server start: {report['unused']}")
+    logger.info(f"Index bootstrap finished: {len(report['created'])} created, {len(report['failed'])} failed")
+    return report
+
+async def find_unused_indexes(collection_name: str) -> list:
+    """Indexes on collection_name with zero accesses in $indexStats, excluding _id."""
+    collection = get_collection(collection_name)
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except Exception as e:
+        logger.debug(f"$indexStats unavailable for {collection_name}: {str(e)}")
+        return []
+    return [
+        f"{collection_name}.{stat['name']}"
+        for stat in stats
+        if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0
+    ]
@@ -0,0 +1,112 @@
+from db import get_collection
+from bson.objectid import ObjectId
+from datetime import datetime, timedelta
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Strong references to running jobs so they are not garbage collected mid-run
+_running_tasks = set()
+
+# Running jobs touch updated_at this often; one silent for JOB_STALE_AFTER lost its worker
+JOB_HEARTBEAT_INTERVAL = timedelta(seconds=30)
+JOB_STALE_AFTER = timedelta(minutes=2)
+
+async def create_job(job_type: str, params: dict) -> str:
+    collection = get_collection("jobs")
+    now = datetime.utcnow()
+    result = await collection.insert_one({
+        "type": job_type,
+        "params": params,
+        "status": "pending",
+        "progress": {},
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    })
+    return str(result.inserted_id)
+
+async def update_job_progress(job_id: str, **progress):
+    collection = get_collection("jobs")
+    await collection.update_one(
+        {"_id": ObjectId(job_id)},
+        {"$set": {**{f"progress.{key}": value for key, value in progress.items()}, "updated_at": datetime.utcnow()}},
+    )
+
+async def _set_job_status(job_id: str, status: str, error: str = None):
+    collection = get_collection("jobs")
+    await collection.update_one(
+        {"_id": ObjectId(job_id)},
+        {"$set": {"status": status, "error": error, "updated_at": datetime.utcnow()}},
+    )
+
+async def get_job(job_id: str) -> dict:
+    if not ObjectId.is_valid(job_id):
+        raise ValueError("Invalid job ID format")
+    collection = get_collection("jobs")
+    job = await collection.find_one({"_id": ObjectId(job_id)})
+    if job:
+        job["_id"] = str(job["_id"])
+    return job
+
+async def _heartbeat(job_id: str):
+    collection = get_collection("jobs")
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_INTERVAL.total_seconds())
+        try:
+            await collection.update_one(
+                {"_id": ObjectId(job_id), "status": "running"},
+                {"$set": {"updated_at": datetime.utcnow()}},
+            )
+        except Exception as e:
+            logger.warning(f"Could not record heartbeat for job {job_id}: {str(e)}")
+
+async def fail_interrupted_jobs(now: datetime = None) -> int:
+    """
+    Mark pending or running jobs that stopped heartbeating as failed; their
+    worker was restarted or died before they finished. Returns how many changed.
+    """
+    now = now or datetime.utcnow()
+    collection = get_collection("jobs")
+    result = await collection.update_many(
+        {"status": {"$in": ["pending", "running"]}, "updated_at": {"$lt": now - JOB_STALE_AFTER}},
+        {"$set": {"status": "failed", "error": "Interrupted before completion", "updated_at": now}},
+    )
+    return result.modified_count
+
+async def reconcile_interrupted_jobs():
+    """
+    Run once per worker start: wait out JOB_STALE_AFTER so jobs live on other
+    workers have heartbeated, then fail whatever a previous process left behind.
+    """
+    await asyncio.sleep(JOB_STALE_AFTER.total_seconds())
+    try:
+        failed = await fail_interrupted_jobs()
+        if failed:
+            logger.warning(f"Marked {failed} interrupted jobs as failed")
+    except Exception as e:
+        logger.error(f"Error reconciling interrupted jobs: {str(e)}", exc_info=True)
+
+def start_job(job_id: str, work):
+    """
+    Run the coroutine function work(job_id) in the background, recording
+    running/completed/failed on the job document.
+    """
+    async def runner():
+        heartbeat = asyncio.create_task(_heartbeat(job_id))
+        try:
+            await _set_job_status(job_id, "running")
+            await work(job_id)
+            await _set_job_status(job_id, "completed")
+            logger.info(f"Job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+            await _set_job_status(job_id, "failed", str(e))
+        finally:
+            heartbeat.cancel()
+
+    task = asyncio.create_task(runner())
+    _running_tasks.add(task)
+    task.add_done_callback(_running_tasks.discard)
+    return task
@@ -1,4 +1,4 @@
-from db import db_client
+from db import get_collection
 import logging
 from datetime import datetime
 import pytz
@@ -8,13 +8,12 @@ from pydantic import ValidationError
 IST = pytz.timezone("Asia/Kolkata")
 
 logger = logging.getLogger(__name__)
-collection = db_client["centerofexcellence"]["newsletter"]
 
 async def subscribe_user(email: str):
     """Subscribe a user to the newsletter by email."""
     try:
         # Check if email is already subscribed
-        existing = await collection.find_one({"email": email})
+        existing = await get_collection("newsletter").find_one({"email": email})
         if existing:
             logger.info(f"Email already subscribed: {email}")
             return {"message": "This email is already subscribed."}
@@ -32,7 +31,7 @@ async def subscribe_user(email: str):
         logger.info(f"Subscribing email: {email}")
 
         # Insert into database
-        result = await collection.insert_one(subscription.dict(by_alias=True))
+        result = await get_collection("newsletter").insert_one(subscription.dict(by_alias=True))
         logger.info(f"Subscribed email with _id: {result.inserted_id}")
 
         return {"message": "Subscription successful", "id": str(result.inserted_id)}
@@ -47,7 +46,7 @@ async def subscribe_user(email: str):
 async def get_all_subscribers():
     """Retrieve all newsletter subscribers."""
     try:
-        cursor = collection.find({})
+        cursor = get_collection("newsletter").find({})
         subscribers = await cursor.to_list(length=None)
         # Convert _id to string for JSON response
         for subscriber in subscribers:
@@ -1,12 +1,17 @@
-from db import db_client
+from db import get_collection
 from app.models.notification_model import Notification
 
-collection = db_client["centerofexcellence"]["notifications"]
 
 async def post_notification(notification_data: dict):
-    result = await collection.insert_one(notification_data)
+    result = await get_collection("notifications").insert_one(notification_data)
     return str(result.inserted_id)
 
+async def post_notifications(notifications: list):
+    if not notifications:
+        return []
+    result = await get_collection("notifications").insert_many(notifications, ordered=False)
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
 async def get_notifications_by_event(event_id: str):
-    cursor = collection.find({"event_id": event_id}).sort("created_at", -1)
+    cursor = get_collection("notifications").find({"event_id": event_id}).sort("created_at", -1)
     return await cursor.to_list(length=None)
\ No newline at end of file
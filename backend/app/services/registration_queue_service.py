@@ -0,0 +1,130 @@
+from db import get_collection
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.models.event_registration_model import EventRegistration
+from bson import ObjectId
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RegistrationQueueFullError(Exception):
+    """The ingestion queue is at capacity; the caller should retry later."""
+
+class RegistrationIngestQueue:
+    """
+    Absorbs bursts of registrations into a bounded queue. A single worker drains
+    it into unordered insert_many batches, flushing once a batch is full or the
+    flush interval has passed since its first item, and resolves each caller's
+    future with its own inserted ID or error.
+    """
+
+    def __init__(self, max_size: int = None, batch_size: int = None, flush_interval_ms: int = None):
+        self.max_size = max_size or settings.REGISTRATION_QUEUE_MAX_SIZE
+        self.batch_size = batch_size or settings.REGISTRATION_BATCH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.REGISTRATION_FLUSH_INTERVAL_MS) / 1000
+        self._queue = None
+        self._task = None
+        self._stopping = False
+        self.batches = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info("Registration ingestion queue started")
+
+    async def stop(self):
+        """Stop taking work, let the worker commit whatever is still queued, then end it."""
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._stopping = False
+
+    async def submit(self, registration: dict) -> str:
+        """Queue a registration document and wait until its batch commits; returns its _id."""
+        if self._stopping:
+            raise RegistrationQueueFullError("Registration intake is shutting down, please retry shortly")
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((registration, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise RegistrationQueueFullError("Too many registrations in flight, please retry shortly")
+        return await future
+
+    def _drain(self, limit: int) -> list:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list):
+        documents = [registration for registration, _ in batch]
+        errors = {}
+        try:
+            await get_collection("event_registration").insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            errors = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+        except Exception as e:
+            logger.error(f"Registration batch of {len(batch)} failed: {str(e)}", exc_info=True)
+            errors = {i: str(e) for i in range(len(batch))}
+        self.batches += 1
+        for i, (registration, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in errors:
+                future.set_exception(Exception(f"Error creating registration: {errors[i]}"))
+            else:
+                future.set_result(str(registration["_id"]))
+        for _ in batch:
+            self._queue.task_done()
+        logger.debug(f"Committed registration batch: {len(batch) - len(errors)} inserted, {len(errors)} failed")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "maxSize": self.max_size,
+            "batches": self.batches,
+            "rejected": self.rejected,
+        }
+
+registration_queue = RegistrationIngestQueue()
+
+async def queue_registration(registration_data: dict) -> dict:
+    """
+    Validate a registration, queue it for the next batch insert and return the
+    stored document once committed, built locally rather than read back.
+    """
+    registration = EventRegistration(**registration_data)
+    document = registration.dict(by_alias=True, exclude={"_id", "id"})
+    document["_id"] = ObjectId()
+    await registration_queue.submit(document)
+    document["_id"] = str(document["_id"])
+    return document
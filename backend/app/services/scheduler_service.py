@@ -0,0 +1,100 @@
+from db import get_collection
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.models.notification_model import Notification
+from app.services.event_service import transition_event_statuses
+from app.services.notification_services import post_notifications
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+STATUS_LEASE_ID = "event_status_transitions"
+
+STATUS_MESSAGES = {
+    "ongoing": "{name} has started.",
+    "completed": "{name} has ended. Thank you for taking part!",
+}
+
+async def acquire_lease(lease_id: str, owner: str, ttl: timedelta) -> bool:
+    """
+    Take or renew the lease document lease_id for owner. Succeeds when the lease
+    is free, expired or already held by owner; only one worker holds it at a time.
+    """
+    now = datetime.utcnow()
+    collection = get_collection("scheduler_leases")
+    try:
+        await collection.find_one_and_update(
+            {"_id": lease_id, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + ttl, "renewed_at": now}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # Someone else holds an unexpired lease, so the upsert collided with it
+        return False
+
+async def release_lease(lease_id: str, owner: str):
+    collection = get_collection("scheduler_leases")
+    await collection.delete_one({"_id": lease_id, "owner": owner})
+
+class EventStatusScheduler:
+    """
+    Periodically moves events through upcoming -> ongoing -> completed and posts
+    a notification for each change. Every worker runs the loop, but only the
+    holder of the Mongo lease does the work in a given tick.
+    """
+
+    def __init__(self, interval_seconds: int = None):
+        self.interval_seconds = interval_seconds or settings.SCHEDULER_INTERVAL_SECONDS
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Event status scheduler started as {self.owner}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await release_lease(STATUS_LEASE_ID, self.owner)
+        except Exception as e:
+            logger.warning(f"Could not release scheduler lease: {str(e)}")
+
+    async def _run(self):
+        # The lease outlives one interval so a slow tick does not hand it over mid-run
+        ttl = timedelta(seconds=self.interval_seconds * 2)
+        while True:
+            try:
+                if await acquire_lease(STATUS_LEASE_ID, self.owner, ttl):
+                    await self.tick()
+            except Exception as e:
+                logger.error(f"Event status scheduler tick failed: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def tick(self) -> list:
+        changed = await transition_event_statuses()
+        notifications = [
+            Notification(
+                event_id=event["_id"],
+                type="text",
+                message=STATUS_MESSAGES[event["status"]].format(name=event["eventName"]),
+            ).dict()
+            for event in changed
+        ]
+        await post_notifications(notifications)
+        return changed
+
+event_status_scheduler = EventStatusScheduler()
@@ -0,0 +1,179 @@
+from db import get_collection
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Relevance weight of a term found in each field
+FIELD_WEIGHTS = {"eventName": 4.0, "tags": 3.0, "category": 2.0, "description": 1.0}
+# Fields whose terms can also be matched by prefix (search-as-you-type)
+PREFIX_FIELDS = ("eventName", "tags")
+PREFIX_WEIGHT = 0.5
+SEARCH_PROJECTION = {field: 1 for field in FIELD_WEIGHTS} | {"createdAt": 1, "updatedAt": 1}
+# How often a worker pulls changes made by other workers
+SYNC_INTERVAL_SECONDS = 30
+# How often a sync re-reads every event to drop ones deleted by other workers
+FULL_SYNC_INTERVAL_SECONDS = 3600
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text) -> list:
+    if isinstance(text, list):
+        text = " ".join(str(part) for part in text)
+    return _TOKEN.findall(str(text or "").lower())
+
+class EventSearchIndex:
+    """
+    In-memory inverted index over event name, tags, category and description.
+    Exact term hits are scored by field weight and term frequency; terms from
+    eventName and tags additionally match query prefixes at a lower weight.
+    Every query term has to match for an event to be returned.
+    """
+
+    def __init__(self):
+        self._postings = {}         # term -> {event_id: weighted score}
+        self._prefix_postings = {}  # term -> {event_id: weighted score}, name/tag terms only
+        self._prefix_terms = []     # sorted keys of _prefix_postings
+        self._documents = {}        # event_id -> {"fields": {...}, "createdAt": datetime}
+        self._lock = asyncio.Lock()
+        self._built = False
+        self._synced_at = None
+        self._last_sync_check = 0.0
+        self._last_full_sync = 0.0
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _add(self, event_id: str):
+        fields = self._documents[event_id]["fields"]
+        scores = Counter()
+        prefix_scores = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(fields.get(field)):
+                scores[term] += weight
+                if field in PREFIX_FIELDS:
+                    prefix_scores[term] += weight * PREFIX_WEIGHT
+        for term, score in scores.items():
+            self._postings.setdefault(term, {})[event_id] = score
+        for term, score in prefix_scores.items():
+            if term not in self._prefix_postings:
+                self._prefix_postings[term] = {}
+                insort(self._prefix_terms, term)
+            self._prefix_postings[term][event_id] = score
+
+    def _discard(self, event_id: str):
+        fields = self._documents[event_id]["fields"]
+        for field in FIELD_WEIGHTS:
+            for term in tokenize(fields.get(field)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(event_id, None)
+                    if not postings:
+                        del self._postings[term]
+                prefix_postings = self._prefix_postings.get(term)
+                if prefix_postings is not None:
+                    prefix_postings.pop(event_id, None)
+                    if not prefix_postings:
+                        del self._prefix_postings[term]
+                        self._prefix_terms.pop(bisect_left(self._prefix_terms, term))
+
+    def upsert(self, event: dict):
+        """Index (or re-index) a full event document."""
+        event_id = str(event["_id"])
+        if event_id in self._documents:
+            self._discard(event_id)
+        self._documents[event_id] = {
+            "fields": {field: event.get(field) for field in FIELD_WEIGHTS},
+            "createdAt": event.get("createdAt") or datetime.min,
+        }
+        self._add(event_id)
+
+    def update_fields(self, event_id: str, update_data: dict):
+        """Apply a partial update, as passed to modify_event, to an indexed event."""
+        if event_id not in self._documents or not any(field in update_data for field in FIELD_WEIGHTS):
+            return
+        self._discard(event_id)
+        fields = self._documents[event_id]["fields"]
+        fields.update({field: update_data[field] for field in FIELD_WEIGHTS if field in update_data})
+        self._add(event_id)
+
+    def remove(self, event_id: str):
+        if event_id in self._documents:
+            self._discard(event_id)
+            del self._documents[event_id]
+
+    def _prefix_matches(self, prefix: str) -> dict:
+        matches = {}
+        i = bisect_left(self._prefix_terms, prefix)
+        while i < len(self._prefix_terms) and self._prefix_terms[i].startswith(prefix):
+            for event_id, score in self._prefix_postings[self._prefix_terms[i]].items():
+                matches[event_id] = max(matches.get(event_id, 0.0), score)
+            i += 1
+        return matches
+
+    def search(self, query: str) -> list:
+        """Return matching event IDs ordered by relevance, then newest first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        totals = None
+        for term in terms:
+            term_scores = dict(self._prefix_matches(term))
+            for event_id, score in self._postings.get(term, {}).items():
+                term_scores[event_id] = term_scores.get(event_id, 0.0) + score
+            if totals is None:
+                totals = term_scores
+            else:
+                totals = {event_id: totals[event_id] + score for event_id, score in term_scores.items() if event_id in totals}
+            if not totals:
+                return []
+        return sorted(totals, key=lambda event_id: (totals[event_id], self._documents[event_id]["createdAt"]), reverse=True)
+
+    async def ensure_fresh(self):
+        """
+        Build the index on first use, then periodically pull events changed by
+        other workers. Deletions leave no trace to pull, so every
+        FULL_SYNC_INTERVAL_SECONDS the sync reads all events and drops the rest.
+        """
+        if self._built and time.monotonic() - self._last_sync_check < SYNC_INTERVAL_SECONDS:
+            return
+        async with self._lock:
+            if self._built and time.monotonic() - self._last_sync_check < SYNC_INTERVAL_SECONDS:
+                return
+            collection = get_collection("events")
+            full = not self._built or time.monotonic() - self._last_full_sync >= FULL_SYNC_INTERVAL_SECONDS
+            query = {}
+            if not full and self._synced_at is not None:
+                # Small overlap so writes racing the previous sync are not missed
+                query = {"updatedAt": {"$gte": self._synced_at - timedelta(seconds=5)}}
+            started_at = datetime.utcnow()
+            seen = set()
+            async for event in collection.find(query, SEARCH_PROJECTION):
+                self.upsert(event)
+                seen.add(str(event["_id"]))
+            if full:
+                # Events this worker indexed while the scan ran may not be in it yet
+                cutoff = started_at - timedelta(seconds=5)
+                gone = [
+                    event_id for event_id, document in self._documents.items()
+                    if event_id not in seen and document["createdAt"] < cutoff
+                ]
+                for event_id in gone:
+                    self.remove(event_id)
+                self._last_full_sync = time.monotonic()
+            self._synced_at = started_at
+            self._last_sync_check = time.monotonic()
+            if not self._built:
+                logger.info(f"Built event search index with {len(seen)} events")
+            elif full:
+                logger.info(f"Resynced search index: {len(seen)} events, {len(gone)} removed")
+            elif seen:
+                logger.info(f"Synced {len(seen)} changed events into the search index")
+            self._built = True
+
+event_search_index = EventSearchIndex()
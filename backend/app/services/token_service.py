@@ -0,0 +1,72 @@
+from db import get_collection
+from app.config import settings
+from app.jwt_handler import SECRET_KEY
+from datetime import datetime, timedelta
+import hashlib
+import hmac
+import logging
+import secrets
+import uuid
+
+logger = logging.getLogger(__name__)
+
+class InvalidRefreshTokenError(ValueError):
+    """The refresh token is unknown, expired, revoked or was already used."""
+
+def _token_hash(token: str) -> str:
+    # Only an HMAC of the token is stored, so a database leak does not hand out sessions
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+async def issue_refresh_token(user_id: str, username: str, family: str = None) -> str:
+    """
+    Create a refresh token for the user and return it. Tokens rotated from the same
+    login share a family so a replayed token can revoke the whole chain.
+    """
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    collection = get_collection("refresh_tokens")
+    await collection.insert_one({
+        "token_hash": _token_hash(token),
+        "user_id": str(user_id),
+        "username": username,
+        "family": family or uuid.uuid4().hex,
+        "revoked_at": None,
+        "created_at": now,
+        "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    })
+    return token
+
+async def rotate_refresh_token(token: str) -> tuple:
+    """
+    Spend a refresh token and issue its successor in one atomic update.
+    Returns (user_id, username, new refresh token). Presenting a token that was
+    already rotated revokes its whole family, since it was probably stolen,
+    unless it was rotated less than REFRESH_TOKEN_REUSE_GRACE_SECONDS ago: two
+    tabs refreshing at once then both get a successor in the same family.
+    """
+    token_hash = _token_hash(token)
+    now = datetime.utcnow()
+    collection = get_collection("refresh_tokens")
+    current = await collection.find_one_and_update(
+        {"token_hash": token_hash, "revoked_at": None, "expires_at": {"$gt": now}},
+        {"$set": {"revoked_at": now}},
+    )
+    if current is None:
+        reused = await collection.find_one({"token_hash": token_hash, "revoked_at": {"$ne": None}})
+        grace = timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS)
+        if reused is not None and reused["revoked_at"] > now - grace and reused["expires_at"] > now:
+            logger.info(f"Concurrent refresh for user {reused['user_id']} within the reuse grace window")
+            new_token = await issue_refresh_token(reused["user_id"], reused["username"], reused["family"])
+            return reused["user_id"], reused["username"], new_token
+        if reused is not None:
+            result = await collection.delete_many({"family": reused["family"]})
+            logger.warning(f"Refresh token reuse for user {reused['user_id']}; revoked {result.deleted_count} tokens")
+        raise InvalidRefreshTokenError("Invalid or expired refresh token")
+    new_token = await issue_refresh_token(current["user_id"], current["username"], current["family"])
+    return current["user_id"], current["username"], new_token
+
+async def revoke_user_refresh_tokens(user_id: str) -> int:
+    """Drop every refresh token of a user, e.g. after a password or username change."""
+    collection = get_collection("refresh_tokens")
+    result = await collection.delete_many({"user_id": str(user_id)})
+    return result.deleted_count
@@ -0,0 +1,282 @@
+from db import get_database, get_collection
+from fastapi import UploadFile
+from bson.objectid import ObjectId
+from pathlib import Path
+from app.config import settings
+from app.services.image_service import remove_derivatives
+from datetime import datetime, timedelta
+from collections import Counter
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import uuid
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+UPLOAD_ROOT = Path("uploads")
+TMP_DIR = UPLOAD_ROOT / ".tmp"
+# Stored files stored or re-referenced within this window are never collected, so
+# uploads whose owning document has not been written yet survive a concurrent GC run
+GC_GRACE_PERIOD = timedelta(hours=1)
+
+class UploadTooLargeError(Exception):
+    """Raised when a file or a whole request goes over the configured upload limits."""
+
+class UploadBudget:
+    """Running byte total for one request, shared by all of its concurrent writes."""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.UPLOAD_MAX_REQUEST_BYTES
+        self.used = 0
+
+    def consume(self, size: int):
+        self.used += size
+        if self.used > self.max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds the {self.max_bytes} byte limit per request")
+
+def _write_chunk(f, hasher, chunk: bytes):
+    hasher.update(chunk)
+    f.write(chunk)
+
+async def save_upload(upload: UploadFile, destination: Path, budget: UploadBudget = None) -> str:
+    """
+    Copy an UploadFile to destination in CHUNK_SIZE pieces. Hashing and disk
+    writes run in a worker thread so the event loop keeps serving other requests.
+    Returns the SHA-256 hex digest of the content; a partially written file is
+    removed on failure.
+    """
+    budget = budget or UploadBudget()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    hasher = hashlib.sha256()
+    written = 0
+    f = await asyncio.to_thread(destination.open, "wb")
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > settings.UPLOAD_MAX_FILE_BYTES:
+                raise UploadTooLargeError(
+                    f"{upload.filename} exceeds the {settings.UPLOAD_MAX_FILE_BYTES} byte limit per file"
+                )
+            budget.consume(len(chunk))
+            await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(destination.unlink, True)
+        raise
+    await asyncio.to_thread(f.close)
+    logger.debug(f"Saved {upload.filename} to {destination} ({written} bytes)")
+    return hasher.hexdigest()
+
+def content_path(digest: str, extension: str) -> Path:
+    """Where the file with this digest lives: uploads/<first two hex chars>/<digest><ext>."""
+    return UPLOAD_ROOT / digest[:2] / f"{digest}{extension}"
+
+def _safe_extension(filename: str | None) -> str:
+    extension = Path(filename or "").suffix.lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,10}", extension) else ""
+
+async def store_upload(upload: UploadFile, budget: UploadBudget = None) -> str:
+    """
+    Store an upload by content hash and return its path. Identical content is
+    kept once on disk; each call adds one reference in the uploads collection.
+    """
+    temp_path = TMP_DIR / uuid.uuid4().hex
+    digest = await save_upload(upload, temp_path, budget)
+    extension = _safe_extension(upload.filename)
+    final_path = content_path(digest, extension)
+    try:
+        now = datetime.utcnow()
+        collection = get_collection("uploads")
+        result = await collection.update_one(
+            {"_id": digest + extension},
+            {
+                "$setOnInsert": {
+                    "path": str(final_path),
+                    "size": (await asyncio.to_thread(temp_path.stat)).st_size,
+                    "content_type": upload.content_type or mimetypes.guess_type(upload.filename or "")[0],
+                    "original_name": upload.filename,
+                    "created_at": now,
+                },
+                "$inc": {"ref_count": 1},
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+        )
+        # A document this call created may replace one the GC just swept, whose
+        # file is on its way out, so the content is always written in that case
+        if result.upserted_id is not None or not await asyncio.to_thread(final_path.exists):
+            await asyncio.to_thread(final_path.parent.mkdir, parents=True, exist_ok=True)
+            await asyncio.to_thread(os.replace, temp_path, final_path)
+        else:
+            await asyncio.to_thread(temp_path.unlink, True)
+            logger.info(f"Deduplicated upload {upload.filename} -> {final_path}")
+    except BaseException:
+        await asyncio.to_thread(temp_path.unlink, True)
+        raise
+    return str(final_path)
+
+async def store_uploads(uploads: list) -> list:
+    """
+    Store several UploadFiles concurrently under one request budget and return
+    their paths in the same order. If any of them fails, the references taken
+    by the others are released before the first error is raised.
+    """
+    budget = UploadBudget()
+    results = await asyncio.gather(*(store_upload(upload, budget) for upload in uploads), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await release_uploads([result for result in results if not isinstance(result, BaseException)])
+        raise errors[0]
+    return results
+
+# uploads/<xx>/<digest><ext> and uploads/derived/<digest>/<width>.<ext>
+_CONTENT_HASHED = re.compile(r"(?:[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.?[a-z0-9]*|derived/(?P<source>[0-9a-f]{64})/(?P<variant>\d+)\.[a-z0-9]+)")
+
+def resolve_upload_path(relative_path: str) -> Path | None:
+    """Map a path below uploads/ to a file on disk, refusing anything that escapes the root."""
+    root = UPLOAD_ROOT.resolve()
+    candidate = (root / relative_path).resolve()
+    if not candidate.is_relative_to(root) or candidate.is_relative_to(TMP_DIR.resolve()):
+        return None
+    return candidate
+
+def upload_validators(relative_path: str, stat_result: os.stat_result) -> tuple:
+    """
+    Return (etag, immutable) for a stored file. Content-addressed files get a
+    strong ETag derived from their digest and can be cached forever; anything
+    else falls back to an mtime/size ETag and must be revalidated.
+    """
+    match = _CONTENT_HASHED.fullmatch(relative_path)
+    if match and match.group("digest"):
+        return f'"{match.group("digest")}"', True
+    if match:
+        extension = Path(relative_path).suffix.lstrip(".")
+        return f'"{match.group("source")}-{match.group("variant")}-{extension}"', True
+    return f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"', False
+
+# Resumes saved before the content-addressed store: uploads/<user id>_<event id>_<filename>
+_LEGACY_RESUME = re.compile(r"[0-9a-f]{24}_[0-9a-f]{24}_.+")
+
+def is_public_upload(relative_path: str) -> bool:
+    """
+    Images (banners, thumbnails, logos, posters and their variants) are public.
+    Anything else, such as a registration resume, is only served to its owner.
+    """
+    media_type = mimetypes.guess_type(relative_path)[0] or ""
+    return media_type.startswith("image/") and not _LEGACY_RESUME.fullmatch(relative_path)
+
+async def user_owns_upload(user_id: str, path: str) -> bool:
+    """Whether path is the resume of one of the user's event registrations."""
+    if not ObjectId.is_valid(user_id):
+        return False
+    collection = get_collection("user")
+    owner = await collection.find_one({"_id": ObjectId(user_id), "eventsRegistered.resume": path}, {"_id": 1})
+    return owner is not None
+
+async def get_upload_metadata(path: str) -> dict:
+    collection = get_collection("uploads")
+    return await collection.find_one({"path": path})
+
+def event_upload_paths(event: dict) -> list:
+    """Every stored upload an event document points at, one entry per reference."""
+    paths = [event.get("bannerImage"), event.get("thumbnailImage")]
+    paths.extend(sponsor.get("logo") for sponsor in event.get("sponsors") or [])
+    paths.extend(highlight.get("image") for highlight in event.get("highlights") or [])
+    return [path for path in paths if path]
+
+async def release_uploads(paths) -> int:
+    """
+    Drop one reference per entry in paths, never going below zero. Files are left
+    on disk; collect_garbage_uploads removes them once nothing refers to them.
+    Returns how many stored files lost references.
+    """
+    collection = get_collection("uploads")
+    released = 0
+    for path, count in Counter(path for path in paths if path).items():
+        result = await collection.update_one(
+            {"path": path, "ref_count": {"$gte": count}}, {"$inc": {"ref_count": -count}}
+        )
+        if not result.matched_count:
+            result = await collection.update_one({"path": path}, {"$set": {"ref_count": 0}})
+        released += result.matched_count
+    return released
+
+async def _referenced_upload_paths() -> Counter:
+    """How many times each upload path is referenced by events, notifications and user registrations."""
+    database = get_database()
+    referenced = Counter()
+    events = database["events"].find(
+        {}, {"bannerImage": 1, "thumbnailImage": 1, "sponsors.logo": 1, "highlights.image": 1}
+    )
+    async for event in events:
+        referenced.update(event_upload_paths(event))
+    async for notification in database["notifications"].find({"poster_url": {"$ne": None}}, {"poster_url": 1}):
+        referenced[notification.get("poster_url")] += 1
+    async for user in database["user"].find({"eventsRegistered.resume": {"$exists": True}}, {"eventsRegistered.resume": 1}):
+        referenced.update(registration.get("resume") for registration in user.get("eventsRegistered") or [])
+    referenced.pop(None, None)
+    referenced.pop("", None)
+    return referenced
+
+async def _sweep_upload(collection, upload: dict) -> bool:
+    """
+    Delete one unreferenced stored file. The file is first moved aside, then the
+    document is deleted only if it still has no references and was not touched
+    since the scan; if store_upload got there first the file is put back.
+    """
+    path = Path(upload["path"])
+    tombstone = TMP_DIR / f"{uuid.uuid4().hex}.deleting"
+    await asyncio.to_thread(TMP_DIR.mkdir, parents=True, exist_ok=True)
+    try:
+        await asyncio.to_thread(os.replace, path, tombstone)
+    except FileNotFoundError:
+        tombstone = None
+    result = await collection.delete_one(
+        {"_id": upload["_id"], "path": upload["path"], "ref_count": 0, "updated_at": upload.get("updated_at")}
+    )
+    if not result.deleted_count:
+        if tombstone:
+            await asyncio.to_thread(os.replace, tombstone, path)
+        return False
+    if tombstone:
+        await asyncio.to_thread(tombstone.unlink, True)
+    await remove_derivatives(upload["path"])
+    return True
+
+async def collect_garbage_uploads() -> dict:
+    """
+    Mark and sweep the content-addressed store: recompute each stored file's
+    ref_count from the documents that point at it, and delete files that nothing
+    references any more (after GC_GRACE_PERIOD).
+    """
+    referenced = await _referenced_upload_paths()
+    collection = get_collection("uploads")
+    cutoff = datetime.utcnow() - GC_GRACE_PERIOD
+    removed = 0
+    freed_bytes = 0
+    async for upload in collection.find({}, {"path": 1, "size": 1, "ref_count": 1, "updated_at": 1}):
+        ref_count = referenced.get(upload["path"], 0)
+        if ref_count:
+            if upload.get("ref_count") != ref_count:
+                await collection.update_one({"_id": upload["_id"]}, {"$set": {"ref_count": ref_count}})
+            continue
+        if upload.get("updated_at") and upload["updated_at"] > cutoff:
+            continue
+        if upload.get("ref_count"):
+            # Guarded on updated_at so a reference taken since the scan is kept
+            await collection.update_one(
+                {"_id": upload["_id"], "updated_at": upload.get("updated_at")}, {"$set": {"ref_count": 0}}
+            )
+            upload["ref_count"] = 0
+        if await _sweep_upload(collection, upload):
+            removed += 1
+            freed_bytes += upload.get("size") or 0
+    logger.info(f"Upload GC removed {removed} files, freed {freed_bytes} bytes")
+    return {"removed": removed, "freedBytes": freed_bytes, "referenced": len(referenced)}
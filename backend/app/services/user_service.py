@@ -1,17 +1,88 @@
 from fastapi import HTTPException
-from db import db_client
+from db import get_collection
 from bson.objectid import ObjectId
 from app.models.user_model import User
-from app.core.security import verify_password
+from app.core.security import hash_password_async, needs_rehash, PasswordPoolBusyError
+from app.services.token_service import revoke_user_refresh_tokens
+from app.services.write_service import insert_document, update_document
+from app.core.cache import TTLCache
+from app.config import settings
 
+from pydantic import TypeAdapter, ValidationError
+from pymongo.errors import DuplicateKeyError
+from typing import List, get_args, get_origin
 from datetime import datetime
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def create_user(user_data: dict) -> str:
+# Authenticated principals by bearer token, holding only what authorization needs.
+# Writes to a user drop its entries here; other workers catch up within the TTL.
+PRINCIPAL_FIELDS = ("_id", "username", "email")
+# user _id -> tokens with an entry in principal_cache; entries leave it together
+# with the cache entry, so it never holds more tokens than the cache does
+_principal_tokens = {}
+
+def _forget_principal_token(token: str, principal: dict):
+    tokens = _principal_tokens.get(principal["_id"])
+    if tokens is not None:
+        tokens.discard(token)
+        if not tokens:
+            del _principal_tokens[principal["_id"]]
+
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    on_evict=_forget_principal_token,
+)
+
+def get_cached_principal(token: str) -> dict:
+    return principal_cache.get(token)
+
+def cache_principal(token: str, user: dict) -> dict:
+    principal = {field: user.get(field) for field in PRINCIPAL_FIELDS}
+    principal_cache.set(token, principal)
+    _principal_tokens.setdefault(principal["_id"], set()).add(token)
+    return principal
+
+# Running rehash tasks by user _id; holds strong references and avoids duplicate work
+_rehash_tasks = {}
+
+def schedule_password_rehash(user_id: str, password: str, old_hash: str):
+    """
+    After a successful login with a hash made at an outdated cost, re-hash the
+    password in the background. The write only applies if the stored hash is
+    still old_hash, so a concurrent password change wins.
+    """
+    if user_id in _rehash_tasks or not needs_rehash(old_hash):
+        return None
+
+    async def rehash():
+        try:
+            new_hash = await hash_password_async(password)
+            collection = get_collection("user")
+            result = await collection.update_one(
+                {"_id": ObjectId(user_id), "password": old_hash},
+                {"$set": {"password": new_hash}},
+            )
+            if result.modified_count:
+                logger.info(f"Rehashed password for user {user_id}")
+        except Exception as e:
+            logger.warning(f"Could not rehash password for user {user_id}: {str(e)}")
+
+    task = asyncio.create_task(rehash())
+    _rehash_tasks[user_id] = task
+    task.add_done_callback(lambda _: _rehash_tasks.pop(user_id, None))
+    return task
+
+def invalidate_principal(user_id: str):
+    for token in list(_principal_tokens.get(str(user_id), ())):
+        principal_cache.invalidate(token)
+
+async def create_user(user_data: dict) -> dict:
     try:
-        collection = db_client["centerofexcellence"]["user"]
+        collection = get_collection("user")
 
         user_data["createdAt"] = datetime.utcnow()
         user_data["updatedAt"] = datetime.utcnow()
@@ -26,8 +97,7 @@ async def create_user(user_data: dict) -> str:
         if existing_user:
             raise HTTPException(status_code=400, detail="Email or username already exists")
 
-        result = await collection.insert_one(user_data)
-        return str(result.inserted_id)
+        return await insert_document(collection, user_data)
 
     except Exception as e:
         logger.error(f"Error creating user: {str(e)}", exc_info=True)
@@ -35,7 +105,7 @@ async def create_user(user_data: dict) -> str:
 
 async def get_user_by_id(user_id: str) -> dict:
     try:
-        collection = db_client["centerofexcellence"]["user"]
+        collection = get_collection("user")
         user = await collection.find_one({"_id": ObjectId(user_id)})
         if user:
             user["_id"] = str(user["_id"])
@@ -48,7 +118,7 @@ async def get_user_by_id(user_id: str) -> dict:
 
 async def get_user_by_name(username: str) -> dict:
     try:
-        collection = db_client["centerofexcellence"]["user"]
+        collection = get_collection("user")
         user = await collection.find_one({"username": username})
         if user:
             user["_id"] = str(user["_id"])
@@ -61,57 +131,91 @@ async def get_user_by_name(username: str) -> dict:
 
 async def delete_user(user_id: str) -> dict:
     try:
-        collection = db_client["centerofexcellence"]["user"]
+        collection = get_collection("user")
         result = await collection.delete_one({"_id": ObjectId(user_id)})
+        invalidate_principal(user_id)
+        await revoke_user_refresh_tokens(user_id)
         return result
     except Exception as e:
         logger.error(f"Error deleting user {user_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error deleting user: {str(e)}")
 
+# Validators for single User fields and for single items of its list fields, so a
+# partial update only checks what it changes instead of the whole merged document
+_FIELD_ADAPTERS = {name: TypeAdapter(field.annotation) for name, field in User.model_fields.items() if name != "id"}
+_ITEM_ADAPTERS = {
+    name: TypeAdapter(get_args(field.annotation)[0])
+    for name, field in User.model_fields.items()
+    if get_origin(field.annotation) in (list, List)
+}
+
+def _validate_user_value(adapter: TypeAdapter, field: str, value):
+    try:
+        adapter.validate_python(value)
+    except ValidationError as ve:
+        logger.error(f"Validation failed for user field {field}: {str(ve)}")
+        raise HTTPException(status_code=400, detail=f"Invalid value for {field}: {ve.errors()[0]['msg']}")
+
+async def patch_user(user_id: str, set_fields: dict = None, push: dict = None, pull: dict = None) -> dict:
+    """
+    Change only the given fields of a user in a single round trip and return the
+    updated user, or None if it does not exist.
+      set_fields: {field: value} replaced as a whole
+      push: {list field: [items]} appended to the list
+      pull: {list field: item or query} removed from the list
+    Only the values being written are validated, against the User model's types.
+    """
+    if not ObjectId.is_valid(user_id):
+        logger.error(f"Invalid user ID: {user_id}")
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    set_fields = dict(set_fields or {})
+    push = push or {}
+    pull = pull or {}
+    for field in set_fields:
+        if field not in _FIELD_ADAPTERS:
+            raise HTTPException(status_code=400, detail=f"Unknown user field: {field}")
+    for field in [*push, *pull]:
+        if field not in _ITEM_ADAPTERS:
+            raise HTTPException(status_code=400, detail=f"Not a list field: {field}")
+        if field in set_fields or (field in push and field in pull):
+            raise HTTPException(status_code=400, detail=f"Conflicting updates for {field}")
+
+    if set_fields.get("password") and not set_fields["password"].startswith("$2"):
+        set_fields["password"] = await hash_password_async(set_fields["password"])
+    set_fields["updatedAt"] = datetime.utcnow()
+    for field, value in set_fields.items():
+        _validate_user_value(_FIELD_ADAPTERS[field], field, value)
+    for field, items in push.items():
+        for item in items:
+            _validate_user_value(_ITEM_ADAPTERS[field], field, item)
+
+    update = {"$set": set_fields}
+    if push:
+        update["$push"] = {field: {"$each": list(items)} for field, items in push.items()}
+    if pull:
+        update["$pull"] = pull
+    logger.info(f"Patching user {user_id}: set={list(set_fields)}, push={list(push)}, pull={list(pull)}")
+    collection = get_collection("user")
+    try:
+        updated_user = await update_document(collection, {"_id": ObjectId(user_id)}, update)
+        invalidate_principal(user_id)
+        if updated_user and ("password" in set_fields or "username" in set_fields):
+            # Sessions were issued for the old credentials or the old token subject
+            await revoke_user_refresh_tokens(user_id)
+        return updated_user
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email or username already exists")
+
 async def update_user(user_id: str, user_data: dict) -> dict:
     try:
-        collection = db_client["centerofexcellence"]["user"]
-        if not ObjectId.is_valid(user_id):
-            logger.error(f"Invalid user ID: {user_id}")
-            raise HTTPException(status_code=400, detail="Invalid user ID format")
-        existing_user = await collection.find_one({"_id": ObjectId(user_id)})
-        if not existing_user:
+        updated_user = await patch_user(user_id, set_fields=user_data)
+        if not updated_user:
             logger.error(f"User not found: {user_id}")
             raise HTTPException(status_code=404, detail="User not found")
-        if "password" in user_data:
-             if not user_data["password"].startswith("$2"):
-                user_data["password"] = hash_password(user_data["password"])
-        if "eventsRegistered" in user_data:
-            logger.info(f"Updating eventsRegistered for user {user_id}: {user_data['eventsRegistered']}")
-            for registration in user_data["eventsRegistered"]:
-                if not isinstance(registration, dict) or "eventId" not in registration:
-                    logger.error("Invalid eventsRegistered format")
-                    raise HTTPException(status_code=400, detail="Invalid eventsRegistered format")
-        user_data["updatedAt"] = datetime.utcnow()
-        # Convert _id to string in existing_user before merging
-        existing_user["_id"] = str(existing_user["_id"])
-        updated_user_data = {**existing_user, **user_data}
-        logger.info(f"Validating updated user data: {updated_user_data}")
-        try:
-            User(**updated_user_data)
-        except Exception as ve:
-            logger.error(f"Pydantic validation failed for user {user_id}: {str(ve)}")
-            raise HTTPException(status_code=400, detail=f"Invalid user data: {str(ve)}")
-        logger.info(f"Updating user with _id: {user_id} with data: {user_data}")
-        update_result = await collection.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": user_data}
-        )
-        if update_result.modified_count == 0:
-            logger.warning(f"No changes made to user data for _id: {user_id}")
-            raise HTTPException(status_code=400, detail="No changes made to user data")
-        updated_user = await collection.find_one({"_id": ObjectId(user_id)})
-        if not updated_user:
-            logger.error(f"Failed to retrieve updated user: {user_id}")
-            raise HTTPException(status_code=500, detail="Failed to retrieve updated user")
-        updated_user["_id"] = str(updated_user["_id"])
         logger.info(f"Successfully updated user with _id: {user_id}")
         return updated_user
+    except (HTTPException, PasswordPoolBusyError):
+        raise
     except Exception as e:
         logger.error(f"Error updating user {user_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error updating user: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,26 @@
+from pymongo import ReturnDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def insert_document(collection, document: dict) -> dict:
+    """
+    Insert document and return it as stored, with _id as a string. The result is
+    built from the local copy, so there is no follow-up read.
+    """
+    document = dict(document)
+    result = await collection.insert_one(document)
+    document["_id"] = str(result.inserted_id)
+    return document
+
+async def update_document(collection, query: dict, update: dict, projection: dict = None) -> dict | None:
+    """
+    Apply update to the document matching query and return the document as it
+    is after the update, in the same round trip. Returns None when nothing matched.
+    """
+    document = await collection.find_one_and_update(
+        query, update, projection=projection, return_document=ReturnDocument.AFTER
+    )
+    if document is not None and "_id" in document:
+        document["_id"] = str(document["_id"])
+    return document
@@ -1,5 +1,64 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.config import settings
+import logging
 
-db_client = AsyncIOMotorClient(settings.MONGO_URI)
-db = db_client[settings.DB_NAME]
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+class Database:
+    """
+    Owns the process's single Motor client. The client is created on first use or
+    by connect() in the FastAPI lifespan, never at import time, so pre-fork
+    servers build one pool per worker after forking. Once close() has run, using
+    the client raises until connect() is called again.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._closed = False
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        if self._client is None:
+            if self._closed:
+                raise RuntimeError("MongoDB client is closed")
+            self.connect()
+        return self._client
+
+    def connect(self) -> AsyncIOMotorClient:
+        self._closed = False
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                settings.MONGO_URI,
+                maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+                waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            )
+            logger.info(f"Created MongoDB client (pool {settings.MONGO_MIN_POOL_SIZE}-{settings.MONGO_MAX_POOL_SIZE})")
+        return self._client
+
+    async def warm_up(self):
+        """Open the first connection and check the server is reachable before serving traffic."""
+        await self.client.admin.command("ping")
+        logger.info(f"Connected to MongoDB database {settings.DB_NAME}")
+
+    def close(self):
+        self._closed = True
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+            logger.info("Closed MongoDB client")
+
+    @property
+    def db(self):
+        return self.client[settings.DB_NAME]
+
+database = Database()
+
+def get_database():
+    return database.db
+
+def get_collection(name: str):
+    return database.db[name]
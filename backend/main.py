@@ -1,3 +1,7 @@
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -8,8 +12,50 @@ from app.routes.routes_blog import router as blog_router
 from app.routes.routes_event_registration import router as event_registrations
 from app.routes.routes_newsletter import router as routes_newsletter
 from app.routes.routes_notifications import router as routes_notifications 
+from app.routes.routes_uploads import router as uploads_router
+from app.routes.routes_jobs import router as jobs_router
+from app.services.index_service import ensure_indexes
+from app.services.event_service import backfill_event_start_times
+from app.services.image_service import shutdown_image_pool
+from app.services.job_service import reconcile_interrupted_jobs
+from app.core.security import password_pool
+from app.services.scheduler_service import event_status_scheduler
+from app.services.registration_queue_service import registration_queue
+from app.config import settings
+from db import database
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One Mongo client per worker, created after any pre-fork and warmed before serving
+    database.connect()
+    try:
+        await database.warm_up()
+    except Exception as e:
+        logger.error(f"MongoDB warm-up failed: {str(e)}", exc_info=True)
+    # Make sure every collection has the indexes the services query on
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.error(f"Index bootstrap failed: {str(e)}", exc_info=True)
+    # Fill in startsAt for events created before it existed, without holding up startup
+    backfill = asyncio.create_task(backfill_event_start_times())
+    # Jobs a previous process was running when it stopped would otherwise stay "running" forever
+    reconcile = asyncio.create_task(reconcile_interrupted_jobs())
+    if settings.SCHEDULER_ENABLED:
+        event_status_scheduler.start()
+    registration_queue.start()
+    yield
+    await registration_queue.stop()
+    await event_status_scheduler.stop()
+    backfill.cancel()
+    reconcile.cancel()
+    shutdown_image_pool()
+    password_pool.shutdown()
+    database.close()
 
-app = FastAPI(title="Center of Excellence API")
+app = FastAPI(title="Center of Excellence API", lifespan=lifespan)
 
 # ✅ Add CORS middleware
 app.add_middleware(
@@ -18,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -29,6 +76,8 @@ app.include_router(blog_router, tags=["blogs"])
 app.include_router(event_registrations, tags=["event_registrations"])
 app.include_router(routes_newsletter, tags=["routes_newsletter"])
 app.include_router(routes_notifications, tags=["routes_notifications"])
+app.include_router(uploads_router, tags=["uploads"])
+app.include_router(jobs_router, tags=["jobs"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Settings are read at import time; give the app a harmless configuration
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "centerofexcellence_test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import db
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def mongo():
+    """A fresh in-memory Mongo for every test, installed as the shared client."""
+    from app.services import event_service
+
+    event_service.event_cache.clear()
+    event_service.facet_cache.clear()
+    event_service.event_search_index.__init__()
+    client = AsyncMongoMockClient()
+    db.database._client = client
+    db.database._closed = False
+    yield client[os.environ["DB_NAME"]]
+    db.database._client = None
+    db.database._closed = False
+
+def event_document(i: int = 1, **overrides) -> dict:
+    document = {
+        "eventName": f"Event {i}",
+        "category": "Tech",
+        "tags": ["ai"],
+        "date": "1",
+        "month": "5",
+        "year": "2030",
+        "location": "Hall",
+        "eventMode": "virtual",
+        "description": "d",
+        "organizer": "o",
+        "status": "upcoming",
+        "registeredUsers": [],
+        "totalRegistrations": 0,
+        "capacity": None,
+    }
+    document.update(overrides)
+    return document
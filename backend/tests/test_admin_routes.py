@@ -0,0 +1,43 @@
+import json
+
+import httpx
+import pytest
+
+from conftest import event_document
+from app.config import settings
+from app.jwt_handler import create_access_token
+from app.services import user_service
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def client(mongo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", "root, ops")
+    user_service.principal_cache.clear()
+    await mongo["user"].insert_many([{"username": "ops", "password": "x"}, {"username": "alice", "password": "x"}])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+def _auth(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+@pytest.mark.parametrize("method, url", [
+    ("POST", "/uploads/gc"),
+    ("POST", "/events/import"),
+    ("GET", f"/jobs/{'0' * 24}"),
+])
+async def test_maintenance_endpoints_require_an_admin(client, method, url):
+    assert (await client.request(method, url)).status_code == 422
+    assert (await client.request(method, url, headers=_auth("alice"))).status_code == 403
+    assert (await client.request(method, url, headers=_auth("ops"))).status_code in (200, 404)
+
+async def test_admin_can_import_events(client, mongo):
+    event = event_document(eventName="Imported", eventContact={"name": "n", "email": "e@x.io", "phone": "1"})
+    body = json.dumps(event).encode() + b"\n"
+
+    response = await client.post("/events/import", content=body, headers=_auth("ops"))
+
+    assert response.status_code == 200
+    assert await mongo["events"].count_documents({"eventName": "Imported"}) == 1
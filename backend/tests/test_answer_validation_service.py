@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.answer_validation_service import AnswerValidationError, get_answer_validator
+
+QUESTIONS = [
+    {"question": "Language", "type": "MCQ", "options": ["Python", "Go"]},
+    {"question": "Age", "type": "Question/Answer", "answerType": "Integer"},
+    {"question": "Laptop", "type": "Yes/No"},
+]
+
+def _event(**overrides) -> dict:
+    return {"_id": "a" * 24, "customQuestions": QUESTIONS, "updatedAt": datetime(2030, 1, 1), **overrides}
+
+def test_validator_survives_updated_at_changes():
+    validator = get_answer_validator(_event())
+    assert get_answer_validator(_event(updatedAt=datetime(2030, 1, 2))) is validator
+
+def test_validator_recompiles_when_questions_change():
+    validator = get_answer_validator(_event())
+    edited = get_answer_validator(_event(customQuestions=QUESTIONS[:1]))
+    assert edited is not validator
+    assert len(edited) == 1
+
+def test_validate_by_text():
+    validator = get_answer_validator(_event())
+    validator.validate_by_text({"Language": "Go", "Age": "20", "Laptop": "Yes"})
+    for answers, message in [
+        ({"Language": "Go", "Age": "20"}, "Missing answer for: Laptop"),
+        ({"Language": "C", "Age": "20", "Laptop": "Yes"}, "Allowed: Python, Go"),
+        ({"Language": "Go", "Age": "x", "Laptop": "Yes"}, "must be an integer"),
+        ({"Language": ["Go"], "Age": "1", "Laptop": "Yes"}, "Allowed: Python, Go"),
+    ]:
+        with pytest.raises(AnswerValidationError, match=message):
+            validator.validate_by_text(answers)
+
+def test_validate_indexed():
+    validator = get_answer_validator(_event())
+    validator.validate_indexed([{"index": 0, "answer": "Python"}, {"index": 2, "answer": "No"}])
+    for answers, message in [
+        ([{"index": 3, "answer": "x"}], "Invalid question index: 3"),
+        ([{"index": -1, "answer": "x"}], "Invalid question index: -1"),
+        ([{"index": 2, "answer": "Maybe"}], "Yes/No question 2"),
+    ]:
+        with pytest.raises(AnswerValidationError, match=message):
+            validator.validate_indexed(answers)
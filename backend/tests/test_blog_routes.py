@@ -0,0 +1,40 @@
+import httpx
+import pytest
+from bson import ObjectId
+
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+BLOG = {
+    "title": "Hello",
+    "authorType": "user",
+    "authorId": str(ObjectId()),
+    "authorName": "a",
+    "tags": ["x"],
+    "poster": "p.png",
+    "description": "d",
+    "category": "Tech",
+}
+
+@pytest.fixture
+async def client(mongo):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+async def test_create_and_modify_return_the_written_blog(client, mongo):
+    created = await client.post("/blogs/", json=BLOG)
+    assert created.status_code == 200
+    blog_id = created.json()["_id"]
+    assert await mongo["blogs"].count_documents({"_id": ObjectId(blog_id)}) == 1
+
+    modified = await client.patch(f"/blogs/{blog_id}", json={"title": "Updated", "status": "accepted"})
+
+    assert modified.status_code == 200
+    assert (modified.json()["_id"], modified.json()["title"], modified.json()["status"]) == (blog_id, "Updated", "accepted")
+
+async def test_modifying_a_missing_blog_is_a_404(client):
+    response = await client.patch(f"/blogs/{ObjectId()}", json={"title": "Updated"})
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Blog not found"}
@@ -0,0 +1,19 @@
+import pytest
+
+from db import Database, database, get_collection
+
+def test_client_is_created_lazily_and_shared():
+    local = Database()
+    assert local._client is None
+    assert local.client is local.client
+    local.close()
+
+def test_closed_database_does_not_reconnect():
+    database.close()
+
+    with pytest.raises(RuntimeError):
+        get_collection("events")
+
+    database.connect()
+    assert get_collection("events").name == "events"
+    database.close()
@@ -0,0 +1,70 @@
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.core import cache
+from app.core.cache import TTLCache
+from app.services import event_service
+from app.services.event_service import delete_event, facet_cache, get_event_by_id, modify_event, register_user_for_event
+
+pytestmark = pytest.mark.anyio
+
+async def _cached_event(mongo) -> str:
+    event_id = str((await mongo["events"].insert_one(event_document())).inserted_id)
+    await get_event_by_id(event_id)
+    facet_cache.set("page", {"items": []})
+    return event_id
+
+async def test_registration_keeps_facet_pages(mongo):
+    event_id = await _cached_event(mongo)
+
+    assert await register_user_for_event(event_id, "u1") == "registered"
+
+    assert "page" in facet_cache
+    assert event_id not in event_service.event_cache
+    assert (await get_event_by_id(event_id))["registeredUsers"] == ["u1"]
+
+async def test_non_card_edit_keeps_facet_pages(mongo):
+    event_id = await _cached_event(mongo)
+
+    await modify_event(event_id, {"description": "new"})
+
+    assert "page" in facet_cache
+
+@pytest.mark.parametrize("update", [{"category": "Art"}, {"tags": ["ml"]}, {"status": "completed"}, {"eventName": "New"}])
+async def test_faceted_edit_clears_facet_pages(mongo, update):
+    event_id = await _cached_event(mongo)
+
+    await modify_event(event_id, update)
+
+    assert "page" not in facet_cache
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    evicted = []
+    ttl_cache = TTLCache(max_size=2, ttl_seconds=10, on_evict=lambda key, value: evicted.append(key))
+
+    ttl_cache.set("a", {"n": 1})
+    ttl_cache.set("b", {"n": 2})
+    ttl_cache.get("a")["n"] = 99
+    ttl_cache.set("c", {"n": 3})
+
+    assert ttl_cache.get("a") == {"n": 1}
+    assert "b" not in ttl_cache and evicted == ["b"]
+    now[0] += 11
+    assert ttl_cache.get("a") is None and evicted == ["b", "a"]
+    assert ttl_cache.stats()["hits"] == 2 and ttl_cache.stats()["evictions"] == 1
+
+async def test_reads_are_served_from_the_cache_until_a_write(mongo):
+    event_id = str((await mongo["events"].insert_one(event_document())).inserted_id)
+    assert (await get_event_by_id(event_id))["eventName"] == "Event 1"
+
+    await mongo["events"].update_one({"_id": ObjectId(event_id)}, {"$set": {"eventName": "Behind the cache"}})
+    assert (await get_event_by_id(event_id))["eventName"] == "Event 1"
+
+    await modify_event(event_id, {"description": "new"})
+    assert (await get_event_by_id(event_id))["eventName"] == "Behind the cache"
+
+    await delete_event(event_id)
+    assert await get_event_by_id(event_id) is None
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from conftest import event_document
+from app.routes.routes_event import _ndjson_lines
+from app.services.event_service import export_events, import_events
+
+pytestmark = pytest.mark.anyio
+
+CONTACT = {"name": "n", "email": "e@x.io", "phone": "1"}
+
+class StreamedRequest:
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+async def _collect(lines) -> list:
+    return [line async for line in lines]
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+async def test_lines_are_split_across_chunk_boundaries():
+    request = StreamedRequest(b'{"a"', b': 1}\n{"b": 2}\n\n{"c"', b": 3}")
+
+    assert await _collect(_ndjson_lines(request)) == [b'{"a": 1}', b'{"b": 2}', b"", b'{"c": 3}']
+
+async def test_oversized_lines_are_replaced_by_an_error():
+    request = StreamedRequest(b"short\n" + b"x" * 6, b"x" * 6 + b"\nok\n", b"y" * 20)
+
+    lines = await _collect(_ndjson_lines(request, max_line_bytes=10))
+
+    assert lines[0] == b"short" and lines[2] == b"ok"
+    assert [str(line) for line in (lines[1], lines[3])] == ["Line exceeds 10 bytes"] * 2
+
+async def test_import_reports_errors_per_line(mongo):
+    valid = json.dumps(event_document(eventName="Good", eventContact=CONTACT))
+    lines = [
+        valid,
+        "{not json",
+        "[1, 2]",
+        "",
+        json.dumps({"eventName": "Missing fields"}),
+        ValueError("Line exceeds 10 bytes"),
+    ]
+
+    summary = await import_events(_aiter(lines))
+
+    assert summary["inserted"] == 1 and summary["failed"] == 4
+    assert [error["line"] for error in summary["errors"]] == [2, 3, 5, 6]
+    assert summary["errors"][1]["error"] == "Each line must be a JSON object"
+    assert summary["errors"][3]["error"] == "Line exceeds 10 bytes"
+    assert await mongo["events"].count_documents({"eventName": "Good"}) == 1
+
+async def test_reimporting_an_export_reports_duplicates(mongo):
+    await import_events(_aiter([json.dumps(event_document(i, eventContact=CONTACT)) for i in range(3)]))
+    exported = await _collect(export_events())
+
+    assert len(exported) == 3 and all(line.endswith("\n") for line in exported)
+    summary = await import_events(_aiter(exported))
+
+    assert (summary["inserted"], summary["failed"]) == (0, 3)
+    assert await mongo["events"].count_documents({}) == 3
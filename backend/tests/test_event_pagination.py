@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services.event_service import decode_event_cursor, encode_event_cursor, get_events_page
+
+pytestmark = pytest.mark.anyio
+
+async def _seed(mongo) -> list:
+    start = datetime(2030, 1, 1)
+    documents = [event_document(i, createdAt=start + timedelta(days=i % 3)) for i in range(5)]
+    # Legacy events written before createdAt existed
+    documents += [event_document(i) for i in range(5, 8)]
+    result = await mongo["events"].insert_many(documents)
+    return [str(_id) for _id in result.inserted_ids]
+
+async def _walk(sort: str, limit: int) -> list:
+    seen, after = [], None
+    while True:
+        events, after = await get_events_page(limit, after, None, sort)
+        seen.extend(events)
+        if after is None:
+            return seen
+
+def test_cursor_round_trip():
+    event = {"_id": "a" * 24, "createdAt": datetime(2030, 1, 2, 3, 4, 5)}
+    cursor = encode_event_cursor(event)
+    assert decode_event_cursor(cursor) == (datetime(2030, 1, 2, 3, 4, 5), ObjectId(event["_id"]))
+    with pytest.raises(ValueError):
+        decode_event_cursor(cursor, "startsAt")
+    with pytest.raises(ValueError):
+        decode_event_cursor("not-a-cursor")
+
+def test_cursor_for_event_without_sort_field():
+    cursor = encode_event_cursor({"_id": "b" * 24})
+    assert decode_event_cursor(cursor)[0] is None
+
+@pytest.mark.parametrize("sort", ["-createdAt", "createdAt"])
+async def test_pages_cover_every_event_once(mongo, sort):
+    ids = await _seed(mongo)
+
+    seen = await _walk(sort, limit=2)
+
+    assert sorted(event["_id"] for event in seen) == sorted(ids)
+    dated = [event["createdAt"] for event in seen if event.get("createdAt")]
+    assert dated == sorted(dated, reverse=sort.startswith("-"))
+
+async def test_no_limit_returns_everything(mongo):
+    ids = await _seed(mongo)
+
+    events, next_cursor = await get_events_page(None, sort="createdAt")
+
+    assert len(events) == len(ids)
+    assert next_cursor is None
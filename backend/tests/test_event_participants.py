@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services.event_service import get_event_participants, invalidate_event
+
+pytestmark = pytest.mark.anyio
+
+async def _registered_event(mongo, count: int) -> tuple:
+    user_ids = []
+    for i in range(count):
+        result = await mongo["user"].insert_one({"username": f"student{i}", "email": f"s{i}@x.io", "phone": "1", "password": "x"})
+        user_ids.append(str(result.inserted_id))
+    event = await mongo["events"].insert_one(event_document(registeredUsers=user_ids, totalRegistrations=count))
+    event_id = str(event.inserted_id)
+    for user_id in user_ids:
+        await mongo["user"].update_one(
+            {"_id": ObjectId(user_id)},
+            {"$push": {"eventsRegistered": {"eventId": event_id, "registeredAt": datetime(2030, 1, 1)}}},
+        )
+    invalidate_event(event_id)
+    return event_id, user_ids
+
+async def test_roster_pages_through_registered_users(mongo):
+    event_id, user_ids = await _registered_event(mongo, 5)
+
+    first, cursor = await get_event_participants(event_id, limit=3)
+    second, last_cursor = await get_event_participants(event_id, limit=3, after=cursor)
+
+    assert [p["id"] for p in first + second] == sorted(user_ids)
+    assert last_cursor is None
+    assert first[0]["name"].startswith("student")
+    assert first[0]["registeredOn"] == datetime(2030, 1, 1)
+    assert "password" not in first[0]
+
+async def test_roster_skips_deleted_users_and_missing_events(mongo):
+    event_id, user_ids = await _registered_event(mongo, 2)
+    await mongo["user"].delete_one({"_id": ObjectId(user_ids[0])})
+
+    participants, _ = await get_event_participants(event_id)
+
+    assert [p["id"] for p in participants] == [user_ids[1]]
+    assert await get_event_participants("0" * 24) is None
+
+async def test_roster_rejects_bad_cursor(mongo):
+    event_id, _ = await _registered_event(mongo, 1)
+    with pytest.raises(ValueError):
+        await get_event_participants(event_id, after="nope")
@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.config import settings
+from app.routes import routes_event
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    app.dependency_overrides[routes_event.get_current_user] = lambda: {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+
+async def _setup(mongo) -> tuple:
+    event = event_document(
+        requireResume=True,
+        allowedFileTypes=["PDF"],
+        requireBasicInfo=False,
+        requireWebLink=False,
+        requirePortfolio=False,
+        customQuestions=[],
+        capacity=5,
+    )
+    event_id = str((await mongo["events"].insert_one(event)).inserted_id)
+    user_id = str((await mongo["user"].insert_one({"username": "a", "password": "x"})).inserted_id)
+    return event_id, user_id
+
+async def _register(client, event_id: str, user_id: str):
+    return await client.post(
+        f"/events/{event_id}/register",
+        data={"user_id": user_id},
+        files={"resume": ("cv.pdf", b"%PDF-1.4", "application/pdf")},
+    )
+
+async def _seats(mongo, event_id: str) -> tuple:
+    event = await mongo["events"].find_one({"_id": ObjectId(event_id)})
+    return event["registeredUsers"], event["totalRegistrations"]
+
+async def test_registration_stores_resume_and_claims_seat(client, mongo):
+    event_id, user_id = await _setup(mongo)
+
+    response = await _register(client, event_id, user_id)
+
+    assert response.status_code == 200
+    assert await _seats(mongo, event_id) == ([user_id], 1)
+    user = await mongo["user"].find_one({"_id": ObjectId(user_id)})
+    assert user["eventsRegistered"][0]["resume"].startswith("uploads/")
+
+async def test_oversized_resume_does_not_claim_a_seat(client, mongo, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_BYTES", 2)
+    event_id, user_id = await _setup(mongo)
+
+    assert (await _register(client, event_id, user_id)).status_code == 413
+    assert await _seats(mongo, event_id) == ([], 0)
+
+async def test_rejected_claim_releases_the_resume(client, mongo):
+    event_id, user_id = await _setup(mongo)
+    await _register(client, event_id, user_id)
+
+    response = await _register(client, event_id, user_id)
+
+    assert response.json()["detail"] == "User already registered for this event"
+    assert [upload["ref_count"] async for upload in mongo["uploads"].find()] == [1]
+
+async def test_failed_user_write_gives_the_seat_back(client, mongo, monkeypatch):
+    event_id, user_id = await _setup(mongo)
+    patch_user = routes_event.patch_user
+
+    async def failing_patch_user(*args, **kwargs):
+        raise RuntimeError("write failed")
+
+    monkeypatch.setattr(routes_event, "patch_user", failing_patch_user)
+    assert (await _register(client, event_id, user_id)).status_code == 500
+    assert await _seats(mongo, event_id) == ([], 0)
+    assert [upload["ref_count"] async for upload in mongo["uploads"].find()] == [0]
+
+    # The retry is not answered with "already registered"
+    monkeypatch.setattr(routes_event, "patch_user", patch_user)
+    assert (await _register(client, event_id, user_id)).status_code == 200
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services.event_service import register_user_for_event
+
+pytestmark = pytest.mark.anyio
+
+async def _event(mongo, **overrides) -> str:
+    return str((await mongo["events"].insert_one(event_document(**overrides))).inserted_id)
+
+async def test_registration_outcomes(mongo):
+    open_event = await _event(mongo)
+    full_event = await _event(mongo, capacity=1, registeredUsers=["u0"], totalRegistrations=1)
+    closed_event = await _event(mongo, status="completed")
+
+    assert await register_user_for_event(open_event, "u1") == "registered"
+    assert await register_user_for_event(open_event, "u1") == "already_registered"
+    assert await register_user_for_event(full_event, "u1") == "full"
+    assert await register_user_for_event(full_event, "u0") == "already_registered"
+    assert await register_user_for_event(closed_event, "u1") == "closed"
+    assert await register_user_for_event("0" * 24, "u1") == "not_found"
+    with pytest.raises(ValueError):
+        await register_user_for_event("nope", "u1")
+
+    event = await mongo["events"].find_one({"_id": ObjectId(open_event)})
+    assert event["registeredUsers"] == ["u1"]
+    assert event["totalRegistrations"] == 1
+
+async def test_legacy_event_without_counter_counts_from_zero(mongo):
+    event_id = await _event(mongo, capacity=1)
+    await mongo["events"].update_one({"_id": ObjectId(event_id)}, {"$unset": {"totalRegistrations": 1}})
+
+    assert await register_user_for_event(event_id, "u1") == "registered"
+    assert await register_user_for_event(event_id, "u2") == "full"
+
+async def test_concurrent_registrations_never_overfill(mongo):
+    event_id = await _event(mongo, capacity=3)
+
+    outcomes = await asyncio.gather(*(register_user_for_event(event_id, f"u{i}") for i in range(10)))
+
+    assert outcomes.count("registered") == 3
+    assert outcomes.count("full") == 7
+    event = await mongo["events"].find_one({"_id": ObjectId(event_id)})
+    assert len(event["registeredUsers"]) == event["totalRegistrations"] == 3
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services.event_service import get_events_page, modify_event, parse_event_start
+
+pytestmark = pytest.mark.anyio
+
+@pytest.mark.parametrize("date, month, year, expected", [
+    ("5", "6", "2030", datetime(2030, 6, 5)),
+    (" 5 ", "June", "2030", datetime(2030, 6, 5)),
+    ("5", "jun", 2030, datetime(2030, 6, 5)),
+    ("31", "2", "2030", None),
+    ("5", "Juno", "2030", None),
+    (None, "6", "2030", None),
+])
+def test_parse_event_start(date, month, year, expected):
+    assert parse_event_start(date, month, year) == expected
+
+async def test_start_range_pages_in_start_order(mongo):
+    days = [9, 2, 20, 5, 14, 28]
+    await mongo["events"].insert_many(
+        [event_document(i, startsAt=datetime(2030, 3, day)) for i, day in enumerate(days)]
+        + [event_document(9, startsAt=None)]
+    )
+
+    seen, after = [], None
+    while True:
+        events, after = await get_events_page(2, after, None, "startsAt", datetime(2030, 3, 3), datetime(2030, 3, 28))
+        seen.extend(event["startsAt"].day for event in events)
+        if after is None:
+            break
+
+    assert seen == [5, 9, 14, 20]
+
+async def test_editing_the_date_moves_the_start(mongo):
+    event_id = str((await mongo["events"].insert_one(event_document(startsAt=datetime(2030, 5, 1)))).inserted_id)
+
+    await modify_event(event_id, {"month": "July"})
+
+    event = await mongo["events"].find_one({"_id": ObjectId(event_id)})
+    assert event["startsAt"] == datetime(2030, 7, 1)
@@ -0,0 +1,53 @@
+import pytest
+from PIL import Image
+
+from app.services import image_service
+from app.services.image_service import _render_derivatives, generate_derivatives, remove_derivatives
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "uploads" / "ab" / f"{'ab' * 32}.png"
+    path.parent.mkdir(parents=True)
+    Image.new("RGBA", (700, 350), (255, 0, 0, 128)).save(path)
+    return str(path.relative_to(tmp_path))
+
+def test_render_writes_each_narrower_width_in_both_formats(source, tmp_path):
+    out = tmp_path / "out"
+
+    variants = _render_derivatives(source, str(out))
+
+    assert sorted(variants) == ["320.jpg", "320.webp", "640.jpg", "640.webp"]
+    assert sorted(path.name for path in out.iterdir()) == sorted(variants)
+    with Image.open(variants["640.jpg"]) as image:
+        assert image.size == (640, 320) and image.mode == "RGB"
+
+def test_render_reuses_existing_variants(source, tmp_path):
+    out = tmp_path / "out"
+    _render_derivatives(source, str(out))
+    mtime = (out / "320.webp").stat().st_mtime_ns
+
+    _render_derivatives(source, str(out))
+
+    assert (out / "320.webp").stat().st_mtime_ns == mtime
+
+async def test_generate_uses_a_spawned_pool(source):
+    try:
+        variants = await generate_derivatives(source)
+        assert image_service._pool._mp_context.get_start_method() == "spawn"
+    finally:
+        image_service.shutdown_image_pool()
+
+    assert len(variants) == 4
+    await remove_derivatives(source)
+    assert not image_service.derived_dir(source).exists()
+
+async def test_generate_ignores_missing_and_non_image_files(source, tmp_path):
+    (tmp_path / "notes.txt").write_text("hi")
+    try:
+        assert await generate_derivatives(None) is None
+        assert await generate_derivatives("notes.txt") is None
+    finally:
+        image_service.shutdown_image_pool()
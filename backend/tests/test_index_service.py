@@ -0,0 +1,26 @@
+import pytest
+
+from app.services.index_service import REQUIRED_INDEXES, ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+ALL_INDEXES = sorted(
+    f"{collection}.{model.document['name']}" for collection, models in REQUIRED_INDEXES.items() for model in models
+)
+
+async def test_missing_indexes_are_created_once(mongo):
+    first = await ensure_indexes()
+    second = await ensure_indexes()
+
+    assert sorted(first["created"]) == ALL_INDEXES and first["failed"] == []
+    assert second["created"] == [] and second["failed"] == []
+    assert "username_1" in await mongo["user"].index_information()
+
+async def test_duplicates_blocking_a_unique_index_are_reported(mongo):
+    await mongo["user"].insert_many([{"username": "a", "email": "a@x.io"}, {"username": "a", "email": "b@x.io"}])
+
+    report = await ensure_indexes()
+
+    assert report["failed"] == ["user.username_1"]
+    assert "user.email_1" in report["created"]
+    assert "username_1" not in await mongo["user"].index_information()
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services.event_service import cascade_delete_event
+from app.services.job_service import JOB_STALE_AFTER, create_job, fail_interrupted_jobs, get_job
+
+pytestmark = pytest.mark.anyio
+
+async def test_interrupted_jobs_are_failed(mongo):
+    now = datetime.utcnow()
+    stale = now - JOB_STALE_AFTER - timedelta(seconds=1)
+    await mongo["jobs"].insert_many([
+        {"_id": "running", "status": "running", "updated_at": stale},
+        {"_id": "pending", "status": "pending", "updated_at": stale},
+        {"_id": "alive", "status": "running", "updated_at": now},
+        {"_id": "done", "status": "completed", "updated_at": stale},
+    ])
+
+    assert await fail_interrupted_jobs(now) == 2
+
+    statuses = {job["_id"]: job["status"] async for job in mongo["jobs"].find()}
+    assert statuses == {"running": "failed", "pending": "failed", "alive": "running", "done": "completed"}
+
+async def test_cascade_releases_only_the_events_uploads(mongo):
+    banner, resume, shared = "uploads/aa/banner.png", "uploads/bb/resume.pdf", "uploads/cc/shared.png"
+    await mongo["uploads"].insert_many([
+        {"_id": "banner", "path": banner, "ref_count": 1},
+        {"_id": "resume", "path": resume, "ref_count": 1},
+        {"_id": "shared", "path": shared, "ref_count": 2},
+    ])
+    event = event_document(bannerImage=banner, sponsors=[{"name": "s", "logo": shared}])
+    event_id = str((await mongo["events"].insert_one(event)).inserted_id)
+    user_id = (await mongo["user"].insert_one({
+        "username": "u",
+        "eventsRegistered": [{"eventId": event_id, "resume": resume}, {"eventId": "other", "resume": shared}],
+    })).inserted_id
+    await mongo["event_registration"].insert_one({"event_id": event_id, "user_id": str(user_id)})
+    await mongo["events"].delete_one({"_id": ObjectId(event_id)})
+    job_id = await create_job("event_cascade_delete", {"event_id": event_id})
+
+    await cascade_delete_event(event_id, job_id, [banner, shared])
+
+    ref_counts = {upload["_id"]: upload["ref_count"] async for upload in mongo["uploads"].find()}
+    assert ref_counts == {"banner": 0, "resume": 0, "shared": 1}
+    user = await mongo["user"].find_one({"_id": user_id})
+    assert [r["eventId"] for r in user["eventsRegistered"]] == ["other"]
+    assert await mongo["event_registration"].count_documents({}) == 0
+    progress = (await get_job(job_id))["progress"]
+    assert progress["stage"] == "done" and progress["uploadsReleased"] == 3
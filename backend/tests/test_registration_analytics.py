@@ -0,0 +1,78 @@
+import pytest
+from bson import ObjectId
+
+from app.services.event_registration_services import analytics_cache, delete_registration, get_answer_analytics
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = [
+    {"question": "Track", "type": "MCQ", "options": ["Web", "ML"]},
+    {"question": "Vegetarian?", "type": "Yes/No"},
+    {"question": "Team", "type": "Text"},
+]
+
+@pytest.fixture(autouse=True)
+def clear_analytics():
+    analytics_cache.clear()
+    yield
+    analytics_cache.clear()
+
+def _registration(user_id: str, track: str, vegetarian: str, team: str, _id: ObjectId = None) -> dict:
+    document = {
+        "event_id": "e1",
+        "user_id": user_id,
+        "answers": [
+            {"index": 0, "answer": track},
+            {"index": 1, "answer": vegetarian},
+            {"index": 2, "answer": team},
+        ],
+    }
+    if _id is not None:
+        document["_id"] = _id
+    return document
+
+def _counts(analytics: dict, index: int) -> dict:
+    return {row["answer"]: row["count"] for row in analytics["questions"][index]["answers"]}
+
+async def test_answers_are_tallied_per_question(mongo):
+    await mongo["event_registration"].insert_many([
+        _registration("u1", "Web", "Yes", "red"),
+        _registration("u2", "Web", "No", "red"),
+        _registration("u3", "ML", "Yes", "blue"),
+    ])
+    await mongo["event_registration"].insert_one({**_registration("u4", "ML", "No", "x"), "event_id": "e2"})
+
+    analytics = await get_answer_analytics("e1", QUESTIONS)
+
+    assert analytics["totalRegistrations"] == 3
+    assert _counts(analytics, 0) == {"Web": 2, "ML": 1}
+    assert _counts(analytics, 1) == {"Yes": 2, "No": 1}
+    assert analytics["questions"][2]["answers"][0] == {"answer": "red", "count": 2}
+    assert [question["responses"] for question in analytics["questions"]] == [3, 3, 3]
+
+async def test_late_committed_registration_is_counted_once_the_cache_expires(mongo):
+    early_id = ObjectId()
+    await mongo["event_registration"].insert_one(_registration("u1", "Web", "Yes", "red"))
+    assert (await get_answer_analytics("e1", QUESTIONS))["totalRegistrations"] == 1
+
+    # Its _id predates the first tally's registrations, as with a slow insert
+    await mongo["event_registration"].insert_one(_registration("u2", "ML", "No", "blue", _id=early_id))
+    assert (await get_answer_analytics("e1", QUESTIONS))["totalRegistrations"] == 1
+
+    analytics_cache.clear()
+    analytics = await get_answer_analytics("e1", QUESTIONS)
+    assert analytics["totalRegistrations"] == 2
+    assert _counts(analytics, 0) == {"Web": 1, "ML": 1}
+
+async def test_deleting_a_registration_drops_the_cached_tally(mongo):
+    await mongo["event_registration"].insert_many([
+        _registration("u1", "Web", "Yes", "red"),
+        _registration("u2", "ML", "No", "blue"),
+    ])
+    assert (await get_answer_analytics("e1", QUESTIONS))["totalRegistrations"] == 2
+
+    await delete_registration("e1", "u1")
+
+    analytics = await get_answer_analytics("e1", QUESTIONS)
+    assert analytics["totalRegistrations"] == 1
+    assert _counts(analytics, 0) == {"Web": 0, "ML": 1}
@@ -0,0 +1,38 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services.event_registration_services import export_registrations, registration_question_columns
+
+pytestmark = pytest.mark.anyio
+
+QUESTIONS = [{"question": "Team"}, {"question": "=Score"}, {"question": "Team"}]
+
+async def _export(mongo, export_format: str) -> str:
+    await mongo["event_registration"].insert_one({
+        "event_id": "e1",
+        "user_id": "u1",
+        "created_at": datetime(2030, 1, 1),
+        "answers": [
+            {"index": 0, "answer": "=HYPERLINK(\"http://x\")"},
+            {"index": 1, "answer": 7},
+            {"index": 2, "answer": "plain"},
+        ],
+    })
+    columns = registration_question_columns(QUESTIONS)
+    return "".join([chunk async for chunk in export_registrations("e1", columns, export_format, batch_size=1)])
+
+async def test_csv_export_neutralises_formulas(mongo):
+    header, row = list(csv.reader(io.StringIO(await _export(mongo, "csv"))))
+
+    assert header[3:] == ["Team", "'=Score", "Team (2)"]
+    assert row[3:] == ["'=HYPERLINK(\"http://x\")", "7", "plain"]
+
+async def test_ndjson_export_keeps_raw_answers(mongo):
+    row = json.loads(await _export(mongo, "ndjson"))
+
+    assert row["Team"] == "=HYPERLINK(\"http://x\")"
+    assert row["=Score"] == 7
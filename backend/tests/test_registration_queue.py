@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.routes import routes_event_registration
+from app.services.registration_queue_service import RegistrationIngestQueue, RegistrationQueueFullError, queue_registration, registration_queue
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def queue(mongo):
+    queue = RegistrationIngestQueue(max_size=100, batch_size=4, flush_interval_ms=20)
+    yield queue
+    await queue.stop()
+
+def _registration(user_id: str) -> dict:
+    return {"_id": ObjectId(), "event_id": "e1", "user_id": user_id, "answers": []}
+
+async def test_concurrent_submissions_are_committed_in_batches(queue, mongo):
+    registrations = [_registration(f"u{i}") for i in range(10)]
+
+    ids = await asyncio.gather(*(queue.submit(registration) for registration in registrations))
+
+    assert ids == [str(registration["_id"]) for registration in registrations]
+    assert await mongo["event_registration"].count_documents({"event_id": "e1"}) == 10
+    assert queue.stats()["batches"] == 3
+
+async def test_a_failed_write_only_fails_its_own_caller(queue, mongo):
+    duplicate = _registration("u0")
+    await mongo["event_registration"].insert_one(dict(duplicate))
+
+    results = await asyncio.gather(
+        queue.submit(_registration("u1")), queue.submit(duplicate), queue.submit(_registration("u2")),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], Exception) and "Error creating registration" in str(results[1])
+    assert all(isinstance(result, str) for result in (results[0], results[2]))
+    assert await mongo["event_registration"].count_documents({}) == 3
+
+async def test_submissions_beyond_the_queue_size_are_rejected(mongo):
+    queue = RegistrationIngestQueue(max_size=1, batch_size=4, flush_interval_ms=20)
+    try:
+        results = await asyncio.gather(
+            queue.submit(_registration("u1")), queue.submit(_registration("u2")), return_exceptions=True
+        )
+    finally:
+        await queue.stop()
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], RegistrationQueueFullError)
+    assert queue.stats()["rejected"] == 1
+
+async def test_stop_commits_what_is_still_queued(mongo):
+    queue = RegistrationIngestQueue(max_size=100, batch_size=100, flush_interval_ms=200)
+    pending = [asyncio.ensure_future(queue.submit(_registration(f"u{i}"))) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await queue.stop()
+
+    assert len(await asyncio.gather(*pending)) == 3
+    assert await mongo["event_registration"].count_documents({}) == 3
+    assert queue.stats()["batches"] == 1
+
+async def test_queue_registration_returns_the_stored_document(mongo):
+    try:
+        created = await queue_registration({"event_id": "e1", "user_id": "u1"})
+    finally:
+        await registration_queue.stop()
+
+    stored = await mongo["event_registration"].find_one({"_id": ObjectId(created["_id"])})
+    assert (stored["event_id"], stored["user_id"]) == (created["event_id"], created["user_id"]) == ("e1", "u1")
+
+async def test_full_queue_is_a_429_with_retry_after(mongo, monkeypatch):
+    event_id = str((await mongo["events"].insert_one(event_document())).inserted_id)
+
+    async def full(registration_data):
+        raise RegistrationQueueFullError("Too many registrations in flight, please retry shortly")
+
+    monkeypatch.setattr(routes_event_registration, "queue_registration", full)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/event_registrations/", json={"event_id": event_id, "user_id": "u1", "answers": []})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import event_document
+from app.services import event_service
+from app.services.scheduler_service import STATUS_LEASE_ID, EventStatusScheduler, acquire_lease, release_lease
+
+pytestmark = pytest.mark.anyio
+
+TTL = timedelta(seconds=60)
+
+async def test_lease_is_exclusive_until_released(mongo):
+    assert await acquire_lease(STATUS_LEASE_ID, "a", TTL)
+    assert await acquire_lease(STATUS_LEASE_ID, "a", TTL)
+    assert not await acquire_lease(STATUS_LEASE_ID, "b", TTL)
+
+    await release_lease(STATUS_LEASE_ID, "b")
+    assert not await acquire_lease(STATUS_LEASE_ID, "b", TTL)
+
+    await release_lease(STATUS_LEASE_ID, "a")
+    assert await acquire_lease(STATUS_LEASE_ID, "b", TTL)
+
+async def test_expired_lease_can_be_taken_over(mongo):
+    await mongo["scheduler_leases"].insert_one(
+        {"_id": STATUS_LEASE_ID, "owner": "a", "expires_at": datetime.utcnow() - timedelta(seconds=1)}
+    )
+    assert await acquire_lease(STATUS_LEASE_ID, "b", TTL)
+    lease = await mongo["scheduler_leases"].find_one({"_id": STATUS_LEASE_ID})
+    assert lease["owner"] == "b"
+
+async def test_transitions_move_events_once(mongo):
+    now = datetime(2030, 5, 10, 12, 0, 0, 123456)
+    await mongo["events"].insert_many([
+        event_document(1, startsAt=now - timedelta(hours=1)),
+        event_document(2, startsAt=now - timedelta(days=2), status="ongoing"),
+        event_document(3, startsAt=now + timedelta(days=1)),
+    ])
+
+    changed = await event_service.transition_event_statuses(now)
+
+    assert sorted((e["eventName"], e["status"]) for e in changed) == [("Event 1", "ongoing"), ("Event 2", "completed")]
+    assert await event_service.transition_event_statuses(now) == []
+
+async def test_transitions_skip_events_changed_meanwhile(mongo, monkeypatch):
+    now = datetime(2030, 5, 10, 12, 0)
+    await mongo["events"].insert_many([
+        event_document(1, startsAt=now - timedelta(hours=1)),
+        event_document(2, startsAt=now - timedelta(hours=1)),
+    ])
+    collection = mongo["events"]
+    update_many = collection.update_many
+
+    async def racing_update_many(query, update, **kwargs):
+        # Another worker cancels Event 2 between the find and the update
+        await collection.update_one({"eventName": "Event 2"}, {"$set": {"status": "cancelled"}})
+        return await update_many(query, update, **kwargs)
+
+    monkeypatch.setattr(collection, "update_many", racing_update_many)
+    monkeypatch.setattr(event_service, "get_collection", lambda name: collection)
+
+    changed = await event_service.transition_event_statuses(now)
+
+    assert [e["eventName"] for e in changed] == ["Event 1"]
+
+async def test_tick_posts_a_notification_per_change(mongo):
+    await mongo["events"].insert_one(event_document(1, startsAt=datetime.utcnow() - timedelta(hours=1)))
+
+    changed = await EventStatusScheduler(interval_seconds=1).tick()
+
+    notifications = await mongo["notifications"].find().to_list(length=None)
+    assert len(changed) == 1
+    assert [n["message"] for n in notifications] == ["Event 1 has started."]
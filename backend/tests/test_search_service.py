@@ -0,0 +1,38 @@
+import pytest
+from bson import ObjectId
+
+from conftest import event_document
+from app.services import search_service
+from app.services.event_service import event_search_index, search_events
+
+pytestmark = pytest.mark.anyio
+
+async def _seed(mongo, count: int) -> list:
+    result = await mongo["events"].insert_many([event_document(i, eventName=f"Robotics {i}") for i in range(count)])
+    return [str(_id) for _id in result.inserted_ids]
+
+async def test_search_drops_hits_deleted_elsewhere_and_refills_the_page(mongo):
+    ids = await _seed(mongo, 4)
+    await search_events("robotics")
+    # Another worker deletes two events; this worker's index still has them
+    await mongo["events"].delete_many({"_id": {"$in": [ObjectId(event_id) for event_id in ids[:2]]}})
+
+    events, total = await search_events("robotics", limit=2)
+
+    assert sorted(event["_id"] for event in events) == sorted(ids[2:])
+    assert total == 2
+    assert len(event_search_index) == 2
+
+async def test_full_sync_removes_events_deleted_elsewhere(mongo, monkeypatch):
+    ids = await _seed(mongo, 3)
+    await event_search_index.ensure_fresh()
+    await mongo["events"].delete_one({"_id": ObjectId(ids[0])})
+    monkeypatch.setattr(search_service, "SYNC_INTERVAL_SECONDS", 0)
+
+    await event_search_index.ensure_fresh()
+    assert len(event_search_index) == 3
+
+    monkeypatch.setattr(search_service, "FULL_SYNC_INTERVAL_SECONDS", 0)
+    await event_search_index.ensure_fresh()
+    assert len(event_search_index) == 2
+    assert ids[0] not in event_search_index.search("robotics")
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from bson import ObjectId
+from passlib.hash import bcrypt
+
+from app.core.security import PasswordHasherPool, PasswordPoolBusyError, needs_rehash, verify_password
+from app.jwt_handler import create_access_token
+from app.services import user_service
+from app.services.user_service import schedule_password_rehash
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+async def test_pool_rejects_work_beyond_its_queue():
+    pool = PasswordHasherPool(workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait))
+        while pool.stats()["running"] == 0:
+            await asyncio.sleep(0.001)
+        queued = asyncio.ensure_future(pool.run(lambda: "done"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordPoolBusyError):
+            await pool.run(lambda: "rejected")
+
+        release.set()
+        assert await running is True
+        assert await queued == "done"
+        stats = pool.stats()
+        assert (stats["rejected"], stats["completed"], stats["queued"], stats["maxQueued"]) == (1, 2, 0, 1)
+    finally:
+        release.set()
+        pool.shutdown()
+
+async def test_outdated_hash_is_rehashed_once_in_the_background(mongo):
+    old_hash = bcrypt.using(rounds=4).hash("secret")
+    user_id = str((await mongo["user"].insert_one({"username": "a", "password": old_hash})).inserted_id)
+    assert needs_rehash(old_hash)
+
+    task = schedule_password_rehash(user_id, "secret", old_hash)
+    assert schedule_password_rehash(user_id, "secret", old_hash) is None
+    await task
+
+    stored = (await mongo["user"].find_one({"_id": ObjectId(user_id)}))["password"]
+    assert stored != old_hash and not needs_rehash(stored) and verify_password("secret", stored)
+    assert user_id not in user_service._rehash_tasks
+
+async def test_rehash_loses_to_a_concurrent_password_change(mongo):
+    old_hash = bcrypt.using(rounds=4).hash("secret")
+    user_id = str((await mongo["user"].insert_one({"username": "a", "password": old_hash})).inserted_id)
+
+    task = schedule_password_rehash(user_id, "secret", old_hash)
+    await mongo["user"].update_one({"_id": ObjectId(user_id)}, {"$set": {"password": "$2b$changed"}})
+    await task
+
+    assert (await mongo["user"].find_one({"_id": ObjectId(user_id)}))["password"] == "$2b$changed"
+
+async def test_current_hash_is_not_rehashed():
+    assert schedule_password_rehash("a" * 24, "secret", bcrypt.using(rounds=12).hash("secret")) is None
+
+async def test_password_update_maps_a_busy_pool_to_503(mongo, monkeypatch):
+    user_id = str((await mongo["user"].insert_one({"username": "a", "password": "x"})).inserted_id)
+    user_service.principal_cache.clear()
+
+    async def busy(password):
+        raise PasswordPoolBusyError("Too many password operations in flight, please retry shortly")
+
+    monkeypatch.setattr(user_service, "hash_password_async", busy)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.patch(
+            f"/users/{user_id}",
+            json={"password": "new secret"},
+            headers={"Authorization": f"Bearer {create_access_token({'sub': 'a'})}"},
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
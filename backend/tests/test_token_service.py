@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.token_service import (
+    InvalidRefreshTokenError,
+    _token_hash,
+    issue_refresh_token,
+    revoke_user_refresh_tokens,
+    rotate_refresh_token,
+)
+
+pytestmark = pytest.mark.anyio
+
+async def _age_rotation(mongo, token: str, seconds: int):
+    await mongo["refresh_tokens"].update_one(
+        {"token_hash": _token_hash(token)},
+        {"$set": {"revoked_at": datetime.utcnow() - timedelta(seconds=seconds)}},
+    )
+
+async def test_rotation_issues_a_successor_in_the_same_family(mongo):
+    token = await issue_refresh_token("user1", "alice")
+
+    user_id, username, successor = await rotate_refresh_token(token)
+
+    assert (user_id, username) == ("user1", "alice")
+    assert successor != token
+    documents = await mongo["refresh_tokens"].find().to_list(length=None)
+    assert len({document["family"] for document in documents}) == 1
+    hashes = {document["token_hash"] for document in documents}
+    assert hashes == {_token_hash(token), _token_hash(successor)}
+
+async def test_reuse_after_grace_revokes_the_family(mongo):
+    token = await issue_refresh_token("user1", "alice")
+    _, _, successor = await rotate_refresh_token(token)
+    await _age_rotation(mongo, token, 60)
+
+    with pytest.raises(InvalidRefreshTokenError):
+        await rotate_refresh_token(token)
+    with pytest.raises(InvalidRefreshTokenError):
+        await rotate_refresh_token(successor)
+    assert await mongo["refresh_tokens"].count_documents({}) == 0
+
+async def test_concurrent_refresh_within_grace_is_benign(mongo):
+    token = await issue_refresh_token("user1", "alice")
+    _, _, first = await rotate_refresh_token(token)
+
+    _, _, second = await rotate_refresh_token(token)
+
+    assert second != first
+    await rotate_refresh_token(first)
+    await rotate_refresh_token(second)
+
+async def test_expired_and_unknown_tokens_are_rejected(mongo):
+    token = await issue_refresh_token("user1", "alice")
+    await mongo["refresh_tokens"].update_one({}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+
+    for candidate in (token, "unknown"):
+        with pytest.raises(InvalidRefreshTokenError):
+            await rotate_refresh_token(candidate)
+
+async def test_revoke_user_refresh_tokens(mongo):
+    await issue_refresh_token("user1", "alice")
+    await issue_refresh_token("user1", "alice")
+    other = await issue_refresh_token("user2", "bob")
+
+    assert await revoke_user_refresh_tokens("user1") == 2
+    await rotate_refresh_token(other)
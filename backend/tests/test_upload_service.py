@@ -0,0 +1,105 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.config import settings
+from app.services import upload_service
+from app.services.upload_service import (
+    GC_GRACE_PERIOD,
+    UploadTooLargeError,
+    _sweep_upload,
+    collect_garbage_uploads,
+    store_upload,
+    store_uploads,
+)
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def upload_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def _upload(content: bytes, name: str = "banner.png") -> UploadFile:
+    return UploadFile(io.BytesIO(content), filename=name)
+
+async def _age(mongo, path: str):
+    old = datetime.utcnow() - GC_GRACE_PERIOD - timedelta(minutes=1)
+    await mongo["uploads"].update_one({"path": path}, {"$set": {"updated_at": old}})
+
+async def test_identical_content_is_stored_once(mongo):
+    first = await store_upload(_upload(b"same"))
+    second = await store_upload(_upload(b"same"))
+
+    assert first == second
+    upload = await mongo["uploads"].find_one({"path": first})
+    assert upload["ref_count"] == 2
+    assert upload["size"] == 4
+    assert list((upload_service.TMP_DIR).iterdir()) == []
+
+async def test_store_rewrites_file_when_document_is_new(mongo):
+    path = await store_upload(_upload(b"v1"))
+    # The GC swept the document and is about to remove the file
+    await mongo["uploads"].delete_many({})
+    upload_service.Path(path).unlink()
+
+    assert await store_upload(_upload(b"v1")) == path
+    assert upload_service.Path(path).read_bytes() == b"v1"
+    assert (await mongo["uploads"].find_one({"path": path}))["ref_count"] == 1
+
+async def test_gc_removes_only_unreferenced_files(mongo):
+    kept = await store_upload(_upload(b"kept"))
+    dropped = await store_upload(_upload(b"dropped"))
+    await mongo["events"].insert_one({"bannerImage": kept})
+    await _age(mongo, kept)
+    await _age(mongo, dropped)
+
+    result = await collect_garbage_uploads()
+
+    assert result["removed"] == 1
+    assert upload_service.Path(kept).exists()
+    assert not upload_service.Path(dropped).exists()
+    assert await mongo["uploads"].find_one({"path": dropped}) is None
+
+async def test_gc_keeps_files_referenced_during_the_sweep(mongo):
+    path = await store_upload(_upload(b"busy"))
+    await mongo["uploads"].update_one({"path": path}, {"$set": {"ref_count": 0}})
+    await _age(mongo, path)
+    snapshot = await mongo["uploads"].find_one({"path": path})
+    # A new store deduplicates against the file after the GC scanned it
+    await store_upload(_upload(b"busy"))
+
+    assert not await _sweep_upload(mongo["uploads"], snapshot)
+    assert upload_service.Path(path).read_bytes() == b"busy"
+    assert (await mongo["uploads"].find_one({"path": path}))["ref_count"] == 1
+
+async def test_failed_batch_releases_successful_uploads(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_BYTES", 8)
+
+    with pytest.raises(UploadTooLargeError):
+        await store_uploads([_upload(b"small"), _upload(b"far too large")])
+
+    uploads = await mongo["uploads"].find().to_list(length=None)
+    assert [upload["ref_count"] for upload in uploads] == [0]
+
+async def test_oversized_file_is_rejected_without_leaving_a_partial_file(mongo, monkeypatch, upload_root):
+    monkeypatch.setattr(upload_service, "CHUNK_SIZE", 4)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_BYTES", 10)
+
+    with pytest.raises(UploadTooLargeError, match="per file"):
+        await store_upload(_upload(b"x" * 11))
+
+    assert list((upload_root / "uploads" / ".tmp").iterdir()) == []
+    assert await mongo["uploads"].count_documents({}) == 0
+    assert await store_upload(_upload(b"x" * 10))
+
+async def test_request_budget_is_shared_by_all_files(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_BYTES", 12)
+
+    assert len(await store_uploads([_upload(b"a" * 6), _upload(b"b" * 6)])) == 2
+    with pytest.raises(UploadTooLargeError, match="per request"):
+        await store_uploads([_upload(b"c" * 6), _upload(b"d" * 7)])
+
+    assert await mongo["uploads"].count_documents({"ref_count": {"$gt": 0}}) == 2
@@ -0,0 +1,70 @@
+import hashlib
+
+import httpx
+import pytest
+from bson import ObjectId
+
+from app.config import settings
+from app.jwt_handler import create_access_token
+from app.services import user_service
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+IMAGE = b"\x89PNG fake image bytes"
+DIGEST = hashlib.sha256(IMAGE).hexdigest()
+IMAGE_PATH = f"{DIGEST[:2]}/{DIGEST}.png"
+RESUME_PATH = f"cd/{'cd' * 32}.pdf"
+LEGACY_RESUME_PATH = f"{'a' * 24}_{'b' * 24}_cv.png"
+
+@pytest.fixture
+async def client(mongo, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "ADMIN_USERNAMES", "ops")
+    user_service.principal_cache.clear()
+    for relative, content in [(IMAGE_PATH, IMAGE), (RESUME_PATH, b"%PDF"), (LEGACY_RESUME_PATH, b"%PDF")]:
+        path = tmp_path / "uploads" / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    await mongo["user"].insert_many([
+        {"_id": ObjectId("a" * 24), "username": "owner", "password": "x", "eventsRegistered": [
+            {"eventId": "b" * 24, "resume": f"uploads/{RESUME_PATH}"},
+            {"eventId": "c" * 24, "resume": f"uploads/{LEGACY_RESUME_PATH}"},
+        ]},
+        {"username": "other", "password": "x"},
+        {"username": "ops", "password": "x"},
+    ])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+def _auth(username: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+async def test_images_are_public_and_immutable(client):
+    response = await client.get(f"/uploads/{IMAGE_PATH}")
+
+    assert response.status_code == 200
+    assert response.content == IMAGE
+    assert response.headers["etag"] == f'"{DIGEST}"'
+    assert "immutable" in response.headers["cache-control"]
+
+async def test_conditional_and_range_requests(client):
+    etag = (await client.head(f"/uploads/{IMAGE_PATH}")).headers["etag"]
+
+    assert (await client.get(f"/uploads/{IMAGE_PATH}", headers={"If-None-Match": etag})).status_code == 304
+    partial = await client.get(f"/uploads/{IMAGE_PATH}", headers={"Range": "bytes=0-3"})
+    assert partial.status_code == 206
+    assert partial.content == IMAGE[:4]
+
+@pytest.mark.parametrize("path", [RESUME_PATH, LEGACY_RESUME_PATH])
+async def test_resumes_are_served_only_to_owner_and_admins(client, path):
+    assert (await client.get(f"/uploads/{path}")).status_code == 401
+    assert (await client.get(f"/uploads/{path}", headers=_auth("other"))).status_code == 404
+    for username in ("owner", "ops"):
+        response = await client.get(f"/uploads/{path}", headers=_auth(username))
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "private, no-cache"
+
+async def test_paths_outside_the_store_are_refused(client):
+    assert (await client.get("/uploads/../main.py")).status_code == 404
+    assert (await client.get("/uploads/.tmp/whatever.png")).status_code == 404
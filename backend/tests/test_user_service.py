@@ -0,0 +1,110 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.services import user_service
+from app.services.token_service import issue_refresh_token
+from app.services.user_service import cache_principal, get_cached_principal, invalidate_principal, patch_user
+
+@pytest.fixture(autouse=True)
+def principals(monkeypatch):
+    monkeypatch.setattr(user_service.principal_cache, "max_size", 3)
+    user_service.principal_cache.clear()
+    yield
+    user_service.principal_cache.clear()
+
+def _user(i: int) -> dict:
+    return {"_id": f"user{i}", "username": f"u{i}", "email": f"u{i}@x.io", "password": "hash"}
+
+def test_principal_cache_keeps_only_authorization_fields():
+    principal = cache_principal("t1", _user(1))
+    assert principal == {"_id": "user1", "username": "u1", "email": "u1@x.io"}
+    assert get_cached_principal("t1") == principal
+
+def test_invalidate_principal_drops_every_token_of_the_user():
+    cache_principal("t1", _user(1))
+    cache_principal("t2", _user(1))
+    cache_principal("t3", _user(2))
+
+    invalidate_principal("user1")
+
+    assert get_cached_principal("t1") is None and get_cached_principal("t2") is None
+    assert get_cached_principal("t3") is not None
+    assert user_service._principal_tokens == {"user2": {"t3"}}
+
+def test_token_index_is_bounded_by_the_cache():
+    for i in range(50):
+        cache_principal(f"t{i}", _user(i))
+
+    assert sum(len(tokens) for tokens in user_service._principal_tokens.values()) == 3
+    assert set(user_service._principal_tokens) == {"user47", "user48", "user49"}
+
+def test_expired_tokens_leave_the_index(monkeypatch):
+    monkeypatch.setattr(user_service.principal_cache, "ttl_seconds", -1)
+    cache_principal("t1", _user(1))
+
+    assert get_cached_principal("t1") is None
+    assert user_service._principal_tokens == {}
+
+async def _insert_user(mongo, **fields) -> str:
+    document = {"username": "alice", "password": "$2b$12$hash", "email": "a@x.io", "skills": ["go"], **fields}
+    return str((await mongo["user"].insert_one(document)).inserted_id)
+
+@pytest.mark.anyio
+async def test_patch_user_sets_pushes_and_pulls_in_one_update(mongo):
+    user_id = await _insert_user(mongo)
+
+    user = await patch_user(
+        user_id,
+        set_fields={"description": "hi"},
+        push={"interests": ["ml"], "eventsRegistered": [{"eventId": "e1"}]},
+        pull={"skills": "go"},
+    )
+
+    assert user["description"] == "hi"
+    assert user["interests"] == ["ml"]
+    assert user["eventsRegistered"] == [{"eventId": "e1"}]
+    assert user["skills"] == []
+    assert await patch_user("0" * 24, set_fields={"age": 3}) is None
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("kwargs, detail", [
+    ({"set_fields": {"nickname": "x"}}, "Unknown user field: nickname"),
+    ({"push": {"username": ["x"]}}, "Not a list field: username"),
+    ({"set_fields": {"skills": []}, "push": {"skills": ["x"]}}, "Conflicting updates for skills"),
+    ({"push": {"skills": ["x"]}, "pull": {"skills": "x"}}, "Conflicting updates for skills"),
+    ({"set_fields": {"age": "old"}}, "Invalid value for age"),
+    ({"push": {"eventsRegistered": [{"registeredAt": "now"}]}}, "Invalid value for eventsRegistered"),
+])
+async def test_patch_user_rejects_invalid_updates(mongo, kwargs, detail):
+    user_id = await _insert_user(mongo)
+
+    with pytest.raises(HTTPException) as error:
+        await patch_user(user_id, **kwargs)
+
+    assert error.value.status_code == 400
+    assert error.value.detail.startswith(detail)
+    assert (await mongo["user"].find_one({"_id": ObjectId(user_id)}))["skills"] == ["go"]
+
+@pytest.mark.anyio
+async def test_patch_user_reports_duplicate_email(mongo):
+    await mongo["user"].create_index("email", unique=True)
+    await _insert_user(mongo, username="bob", email="b@x.io")
+    user_id = await _insert_user(mongo)
+
+    with pytest.raises(HTTPException) as error:
+        await patch_user(user_id, set_fields={"email": "b@x.io"})
+
+    assert error.value.detail == "Email or username already exists"
+
+@pytest.mark.anyio
+async def test_password_change_hashes_and_ends_sessions(mongo):
+    user_id = await _insert_user(mongo)
+    cache_principal("t1", {"_id": user_id, "username": "alice"})
+    await issue_refresh_token(user_id, "alice")
+
+    user = await patch_user(user_id, set_fields={"password": "new secret"})
+
+    assert user["password"].startswith("$2") and user["password"] != "new secret"
+    assert get_cached_principal("t1") is None
+    assert await mongo["refresh_tokens"].count_documents({}) == 0
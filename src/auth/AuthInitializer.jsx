@@ -32,9 +32,9 @@ const AuthInitializer = ({ children }) => {
         // decode JWT
         const decoded = jwtDecode(token);
 
-        // check expiry
+        // check expiry; an expired token is renewed by fetchUserById if a refresh token is stored
         const now = Date.now() / 1000;
-        if (!decoded?.exp || decoded.exp < now) {
+        if ((!decoded?.exp || decoded.exp < now) && !localStorage.getItem("refreshToken")) {
           throw new Error("Token expired");
         }
 
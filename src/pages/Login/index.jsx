@@ -61,10 +61,11 @@ dispatch(setUserFromToken({
           { username, email, password }
         );
   
-        const { access_token, user_id } = response.data;
+        const { access_token, user_id, refresh_token } = response.data;
   
         localStorage.setItem('token', access_token);
         localStorage.setItem('userId', user_id);
+        if (refresh_token) localStorage.setItem('refreshToken', refresh_token);
   
         dispatch(setUserFromToken({
           token: access_token,
@@ -363,8 +363,17 @@ export const fetchParticipants = createAsyncThunk(
       if (!eventId || typeof eventId !== 'string' || !/^[0-9a-fA-F]{24}$/.test(eventId)) {
         throw new Error('Invalid event ID');
       }
-      const response = await axios.get(`${API_BASE_URL}/${eventId}/participants`);
-      return response.data;
+      // The roster is paged; follow X-Next-Cursor until the last page
+      const participants = [];
+      let after = null;
+      do {
+        const response = await axios.get(`${API_BASE_URL}/${eventId}/participants`, {
+          params: { limit: 500, ...(after ? { after } : {}) },
+        });
+        participants.push(...response.data);
+        after = response.headers['x-next-cursor'] || null;
+      } while (after);
+      return participants;
     } catch (error) {
       console.error(`Error fetching participants for event ${eventId}:`, error);
       return rejectWithValue(error.response?.data?.detail || 'Failed to fetch participants');
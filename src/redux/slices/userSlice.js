@@ -13,10 +13,11 @@ export const login = createAsyncThunk(
         identifier,
         password,
       });
-      const { access_token, user_id } = response.data;
+      const { access_token, user_id, refresh_token } = response.data;
       console.log('Login response:', response.data);
       localStorage.setItem('token', access_token);
 localStorage.setItem('userId', user_id);
+      if (refresh_token) localStorage.setItem('refreshToken', refresh_token);
 
       return { access_token, user_id };
     } catch (error) {
@@ -40,23 +41,62 @@ const isTokenExpired = (token) => {
   }
 };
 
+// Marks errors that mean the session is over and the user has to log in again
+const sessionExpired = (error) => Object.assign(error, { sessionExpired: true });
+
+// One refresh at a time: concurrent callers share it, since the server rotates the refresh token
+let refreshInFlight = null;
+
+// Exchange the stored refresh token for a new access token (and refresh token)
+export const refreshAccessToken = () => {
+  if (!refreshInFlight) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshInFlight = (refreshToken
+      ? axios.post(`${API_BASE_URL}/refresh`, { refresh_token: refreshToken }).then((response) => {
+          const { access_token, refresh_token } = response.data;
+          localStorage.setItem('token', access_token);
+          localStorage.setItem('refreshToken', refresh_token);
+          return access_token;
+        }).catch((error) => {
+          throw error.response?.status === 401 ? sessionExpired(error) : error;
+        })
+      : Promise.reject(sessionExpired(new Error('Token expired. Please log in again.')))
+    ).finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+};
+
+// Call request(token); on an expired token or a 401, refresh once and try again
+const withFreshToken = async (request) => {
+  let token = localStorage.getItem('token');
+  if (isTokenExpired(token)) {
+    token = await refreshAccessToken();
+  }
+  try {
+    return await request(token);
+  } catch (error) {
+    if (error.response?.status !== 401) throw error;
+    return request(await refreshAccessToken());
+  }
+};
+
 // Thunk to fetch user by ID
 export const fetchUserById = createAsyncThunk(
   'user/fetchUserById',
   async (id, { rejectWithValue, dispatch }) => {
     try {
-      const token = localStorage.getItem('token');
-      if (isTokenExpired(token)) {
-        dispatch(logout());
-        throw new Error('Token expired. Please log in again.');
-      }
-      const response = await axios.get(`${API_BASE_URL}/${id}`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
+      const response = await withFreshToken((token) =>
+        axios.get(`${API_BASE_URL}/${id}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        })
+      );
       console.log('fetchUserById response:', response.data);
       return response.data;
     } catch (error) {
       console.error('fetchUserById error:', error);
+      if (error.sessionExpired) dispatch(logout());
       return rejectWithValue(error.response?.data?.detail || 'Failed to fetch user');
     }
   }
@@ -67,22 +107,20 @@ export const updateUser = createAsyncThunk(
   'user/updateUser',
   async ({ userId, userData }, { rejectWithValue, dispatch }) => {
     try {
-      const token = localStorage.getItem('token');
-      if (isTokenExpired(token)) {
-        dispatch(logout());
-        throw new Error('Token expired. Please log in again.');
-      }
-      const response = await axios.patch(`${API_BASE_URL}/${userId}`, userData, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await withFreshToken((token) =>
+        axios.patch(`${API_BASE_URL}/${userId}`, userData, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        })
+      );
       console.log('updateUser response:', response.data);
       // Reset profile prompt flag to allow prompt if profile becomes incomplete
       localStorage.removeItem(`profilePromptShown_${userId}`);
       return response.data;
     } catch (error) {
       console.error(`Error updating user with ID ${userId}:`, error);
+      if (error.sessionExpired) dispatch(logout());
       return rejectWithValue(error.response?.data?.detail || error.message || 'Failed to update user');
     }
   }
@@ -104,6 +142,7 @@ const userSlice = createSlice({
     },
     logout: (state) => {
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       localStorage.removeItem(`profilePromptShown_${state.userId}`);
       state.user = null;
       state.token = null;